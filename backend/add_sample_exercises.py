@@ -55,6 +55,7 @@ for ex_data in exercises_data:
             description=f"Standard {ex_data['muscle_group'].lower()} exercise",
             exercise_type=ex_data["exercise_type"],
             muscle_group=ex_data["muscle_group"],
+            muscle_category=MuscleTracker.classify_muscle_group(ex_data["muscle_group"]),
             equipment_required="Various",
             created_by_admin_id=1,
             is_active=True
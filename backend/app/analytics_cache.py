@@ -0,0 +1,125 @@
+"""
+🗃️ Analytics Result Cache
+Engine outputs only change when the user's workouts change, so they are
+cached in-process under (user_id, name, params, history_version). Writes
+bump users.history_version, which retires every older entry on every
+worker; the write routes also drop the user's entries here right away.
+Entries are LRU-evicted past ANALYTICS_CACHE_SIZE and expire after
+ANALYTICS_CACHE_TTL_SECONDS (results mention "now", so they go stale).
+Keys also carry the current freshness window, so a result - and the ETag
+built from the same window - stays fixed until the window rolls over.
+"""
+
+import copy
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import User
+
+class AnalyticsCache:
+    """Thread-safe LRU + TTL cache of analytics results"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key: Tuple, compute: Callable[[], Any]) -> Any:
+        """Cached value for key, computing and storing it on a miss (returns a copy)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+            self.misses += 1
+
+        # Compute outside the lock - concurrent misses may both compute, last one wins
+        value = compute()
+        with self._lock:
+            self._entries[key] = (now + self.ttl_seconds, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def invalidate_user(self, user_id: int) -> int:
+        """Drop every entry for a user. Returns how many were removed."""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == user_id]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions
+            }
+
+analytics_cache = AnalyticsCache(settings.ANALYTICS_CACHE_SIZE, settings.ANALYTICS_CACHE_TTL_SECONDS)
+
+def freshness_window() -> int:
+    """Index of the current ANALYTICS_CACHE_TTL_SECONDS wall-clock window"""
+    return int(time.time() // max(1, settings.ANALYTICS_CACHE_TTL_SECONDS))
+
+def _freeze(value: Any) -> Hashable:
+    """Hashable form of call arguments"""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def cached_analytics(name: str):
+    """
+    Cache an engine method per user and history version. The instance must
+    carry a TrainingHistory as self.history.
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            user = self.history.user
+            if user is None or not settings.ANALYTICS_CACHE_ENABLED:
+                return method(self, *args, **kwargs)
+            # Bind with defaults so f() and f(default_value) share an entry
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            params = {arg: value for arg, value in bound.arguments.items() if arg != "self"}
+            key = (self.history.user_id, name, _freeze(params), user.history_version or 0, freshness_window())
+            return analytics_cache.get_or_compute(key, lambda: method(self, *args, **kwargs))
+        return wrapper
+    return decorator
+
+def bump_history_version(db: Session, user_id: int) -> None:
+    """Mark the user's history as changed (one UPDATE, in the caller's transaction)"""
+    db.execute(
+        update(User).where(User.id == user_id).values(
+            history_version=func.coalesce(User.history_version, 0) + 1
+        ).execution_options(synchronize_session=False)
+    )
@@ -1,4 +1,5 @@
 from datetime import datetime, timedelta
+from typing import Optional
 from jose import jwt
 from passlib.context import CryptContext
 from app.config import settings
@@ -17,9 +18,9 @@ def create_token(data: dict, expires_delta: timedelta):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
 
-def create_access_token(user_id: int):
+def create_access_token(user_id: int, claims: Optional[dict] = None):
     return create_token(
-        {"sub": str(user_id)},
+        {"sub": str(user_id), **(claims or {})},
         timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     )
 
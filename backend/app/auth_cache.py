@@ -0,0 +1,74 @@
+"""
+🪪 Authenticated User Cache
+Most requests only need who the caller is (id, username, active, admin),
+not the whole users row. That identity is cached in-process for
+AUTH_USER_CACHE_TTL_SECONDS, or carried in the access token itself when
+AUTH_TOKEN_CLAIMS is on, so get_current_user no longer costs a SELECT.
+Admin changes to a user drop their entry; changes made by scripts or
+other workers show up within the TTL.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+from app.config import settings
+
+class AuthUser:
+    """Identity of the authenticated caller (read-only)"""
+
+    __slots__ = ("id", "username", "is_active", "is_admin")
+
+    def __init__(self, id: int, username: str, is_active: bool, is_admin: bool):
+        self.id = id
+        self.username = username
+        self.is_active = bool(is_active)
+        self.is_admin = bool(is_admin)
+
+    @classmethod
+    def from_row(cls, row) -> "AuthUser":
+        """From a User (or a row with the same columns)"""
+        return cls(row.id, row.username, row.is_active, row.is_admin)
+
+    @classmethod
+    def from_claims(cls, user_id: int, payload: Dict[str, Any]) -> Optional["AuthUser"]:
+        """From access-token claims (None if the token doesn't carry them)"""
+        if not all(claim in payload for claim in ("usr", "act", "adm")):
+            return None
+        return cls(user_id, payload["usr"], payload["act"], payload["adm"])
+
+    def to_claims(self) -> Dict[str, Any]:
+        return {"usr": self.username, "act": self.is_active, "adm": self.is_admin}
+
+class AuthUserCache:
+    """Thread-safe user_id -> AuthUser map with a TTL (0 disables it)"""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[AuthUser]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            return entry[1]
+
+    def put(self, user: AuthUser) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.ttl_seconds, user)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+auth_user_cache = AuthUserCache(settings.AUTH_USER_CACHE_TTL_SECONDS)
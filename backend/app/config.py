@@ -1,7 +1,33 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./test_flabs2fabs.db"  # Default fallback
+    READ_DATABASE_URL: Optional[str] = None  # Read replica for analytics (falls back to DATABASE_URL)
+    ASYNC_DATABASE_URL: Optional[str] = None  # Async driver URL (derived from DATABASE_URL when unset)
+    DB_POOL_SIZE: int = 5  # Persistent connections per engine
+    DB_MAX_OVERFLOW: int = 10  # Extra connections allowed during bursts
+    DB_POOL_TIMEOUT: int = 30  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # Replace connections older than this (seconds, -1 = never)
+    DB_POOL_PRE_PING: bool = True  # Ping on checkout; False relies on DB_POOL_RECYCLE alone
+    SQLITE_WAL: bool = True  # SQLite profile: WAL + pragmas + single in-process writer
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MB
+    IMPORT_SPOOL_MEMORY_BYTES: int = 8388608  # Import uploads beyond 8 MB spill to a temp file before parsing
+    ARCHIVE_AFTER_DAYS: int = 365  # Completed workouts older than this move to the archive tables
+    QUERY_DEBUG: bool = False  # Dev/test: count and time queries per request (X-Query-* headers)
+    QUERY_BUDGET_ENFORCE: bool = False  # With QUERY_DEBUG: fail requests that exceed their declared budget
+    QUERY_REPEAT_THRESHOLD: int = 3  # Same statement this many times with different params = N+1 suspect
+    ANALYTICS_CACHE_ENABLED: bool = True  # Cache engine results per user and history_version
+    ANALYTICS_CACHE_SIZE: int = 2048  # Entries kept per process (LRU beyond this)
+    ANALYTICS_CACHE_TTL_SECONDS: int = 300  # Results also expire so "now"-relative values refresh
+    EXERCISE_CATALOG_TTL_SECONDS: int = 300  # Reload the in-memory catalog at least this often
+    ETAG_ENABLED: bool = True  # ETag / If-None-Match (304) on catalog and analytics GETs
+    CATALOG_MAX_AGE_SECONDS: int = 60  # Cache-Control max-age for the public exercise catalog
+    AUTH_USER_CACHE_TTL_SECONDS: int = 30  # Cache the caller's id/username/active/admin per worker (0 = off)
+    USER_STATE_CACHE_TTL_SECONDS: int = 10  # Cache history_version, archive watermark and calendar per worker (0 = off)
+    AUTH_TOKEN_CLAIMS: bool = False  # Carry those in access tokens instead (no lookup; changes apply at token expiry)
     JWT_SECRET: str = "super-secret-change-this-in-production"
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
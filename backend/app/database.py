@@ -1,14 +1,125 @@
 from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.config import settings
+from app.db_pool import pool_options, instrument_engine
+from app.sqlite_profile import is_file_sqlite, apply_pragmas, serialize_writes
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+engine = create_engine(settings.DATABASE_URL, **pool_options(settings.DATABASE_URL))
+instrument_engine(engine, "primary")
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 Base = declarative_base()
 
+# Small deployments on SQLite: WAL so readers never block the writer,
+# and ORM writes queue on one in-process lock instead of hitting SQLITE_BUSY
+if settings.SQLITE_WAL and is_file_sqlite(settings.DATABASE_URL):
+    apply_pragmas(engine)
+    serialize_writes(SessionLocal)
+
+# Read-only analytics can be routed to a replica; without one they share the primary
+if settings.READ_DATABASE_URL:
+    read_engine = create_engine(settings.READ_DATABASE_URL, **pool_options(settings.READ_DATABASE_URL))
+    instrument_engine(read_engine, "replica")
+    if settings.SQLITE_WAL and is_file_sqlite(settings.READ_DATABASE_URL):
+        apply_pragmas(read_engine)
+else:
+    read_engine = engine
+ReadSessionLocal = sessionmaker(bind=read_engine, autoflush=False, autocommit=False)
+
+# Async engine for async def handlers - created on first use so the
+# async driver (aiosqlite / aiomysql) is only required when it is needed
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "postgresql": "postgresql+asyncpg",
+}
+_async_engine = None
+_AsyncSessionLocal = None
+_async_read_engine = None
+_AsyncReadSessionLocal = None
+
+def to_async_url(url: str) -> str:
+    """Swap a sync driver URL for its async equivalent"""
+    scheme, rest = url.split("://", 1)
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
+def _create_async_engine(url: str, name: str):
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    try:
+        async_engine = create_async_engine(url, **pool_options(url, is_async=True))
+    except ImportError as e:
+        raise RuntimeError(f"Async database driver not installed for {url.split('://')[0]}: {e}")
+    instrument_engine(async_engine.sync_engine, name)
+    if settings.SQLITE_WAL and is_file_sqlite(url):
+        apply_pragmas(async_engine.sync_engine)
+    return async_engine
+
+def get_async_engine():
+    """Shared AsyncEngine (ASYNC_DATABASE_URL, or DATABASE_URL on its async driver)"""
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        _async_engine = _create_async_engine(settings.ASYNC_DATABASE_URL or to_async_url(settings.DATABASE_URL), "async")
+        _AsyncSessionLocal = async_sessionmaker(bind=_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+def get_async_read_engine():
+    """AsyncEngine for READ_DATABASE_URL on its async driver - the primary one without a replica"""
+    global _async_read_engine, _AsyncReadSessionLocal
+    if _async_read_engine is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        if settings.READ_DATABASE_URL:
+            _async_read_engine = _create_async_engine(to_async_url(settings.READ_DATABASE_URL), "async_replica")
+        else:
+            _async_read_engine = get_async_engine()
+        _AsyncReadSessionLocal = async_sessionmaker(bind=_async_read_engine, autoflush=False, expire_on_commit=False)
+    return _async_read_engine
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+def get_read_db():
+    """Session for read-only endpoints - replica if reachable, primary otherwise"""
+    db = ReadSessionLocal()
+    if read_engine is not engine:
+        try:
+            db.connection()
+        except OperationalError as e:
+            print(f"Read replica unavailable, using primary: {e}")
+            db.close()
+            db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    """AsyncSession for async def handlers - never blocks the event loop on I/O"""
+    get_async_engine()
+    async with _AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db():
+    """AsyncSession for read-only async handlers - replica if reachable, primary otherwise"""
+    primary, replica = get_async_engine(), get_async_read_engine()
+    db = _AsyncReadSessionLocal()
+    if replica is not primary:
+        try:
+            await db.connection()
+        except OperationalError as e:
+            print(f"Read replica unavailable, using primary: {e}")
+            await db.close()
+            db = _AsyncSessionLocal()
+    try:
+        yield db
+    finally:
+        await db.close()
@@ -0,0 +1,149 @@
+"""
+🚰 Connection Pool Sizing & Statistics
+Pool options come from Settings; pool events and a timed QueuePool feed
+per-engine counters (checkouts, overflow, acquire wait, timeouts) so
+"QueuePool limit reached" errors under burst load can be diagnosed.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from app.config import settings
+
+class PoolStats:
+    """Thread-safe counters for one engine's pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.checkouts = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+
+    def on_connect(self) -> None:
+        with self._lock:
+            self.connections_opened += 1
+
+    def on_checkout(self) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def on_checkin(self) -> None:
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def on_invalidate(self) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def record_wait(self, elapsed_ms: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total_ms += elapsed_ms
+            self.wait_max_ms = max(self.wait_max_ms, elapsed_ms)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self, pool=None) -> Dict[str, Any]:
+        with self._lock:
+            data = {
+                "connections_opened": self.connections_opened,
+                "checkouts": self.checkouts,
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.wait_total_ms / self.wait_count, 3) if self.wait_count else 0.0,
+                "max_wait_ms": round(self.wait_max_ms, 3),
+            }
+        if isinstance(pool, QueuePool):
+            data.update({
+                "pool_size": pool.size(),
+                "idle": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "timeout_s": pool.timeout(),
+            })
+        return data
+
+class _TimedPoolMixin:
+    """Measures how long each checkout waits for a connection"""
+
+    stats: Optional[PoolStats] = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except PoolTimeoutError:
+            if self.stats is not None:
+                self.stats.record_wait((time.perf_counter() - start) * 1000, timed_out=True)
+            raise
+        if self.stats is not None:
+            self.stats.record_wait((time.perf_counter() - start) * 1000)
+        return record
+
+    def recreate(self):
+        # Keep counting across pool recreation (e.g. after a disconnect)
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+# name -> (stats, engine)
+_registry: Dict[str, tuple] = {}
+
+def pool_options(url: str, is_async: bool = False) -> Dict[str, Any]:
+    """create_engine() pool keyword arguments for a database URL"""
+    options: Dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":")):
+        # In-memory SQLite keeps its single-connection pool
+        return options
+    options.update({
+        "poolclass": TimedAsyncQueuePool if is_async else TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    })
+    return options
+
+def instrument_engine(engine: Engine, name: str) -> PoolStats:
+    """Attach pool event counters to an engine (pass AsyncEngine.sync_engine for async)"""
+    if name in _registry:
+        return _registry[name][0]
+
+    stats = PoolStats(name)
+    if isinstance(engine.pool, _TimedPoolMixin):
+        engine.pool.stats = stats
+
+    event.listen(engine, "connect", lambda *args: stats.on_connect())
+    event.listen(engine, "checkout", lambda *args: stats.on_checkout())
+    event.listen(engine, "checkin", lambda *args: stats.on_checkin())
+    event.listen(engine, "invalidate", lambda *args: stats.on_invalidate())
+
+    _registry[name] = (stats, engine)
+    return stats
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Current counters and pool status for every instrumented engine"""
+    return {
+        name: stats.snapshot(engine.pool)
+        for name, (stats, engine) in _registry.items()
+    }
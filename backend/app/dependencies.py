@@ -1,14 +1,20 @@
+from typing import Optional, Tuple
 from fastapi import Depends, HTTPException, status, Header
 from jose import jwt, JWTError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import engine, read_engine, get_db, get_read_db, get_async_read_db
 from app.config import settings
 from app.models import User
+from app.auth_cache import AuthUser, auth_user_cache
+from app.user_state import UserState, load_user_state, user_state_cache
+from app.training_history import TrainingHistory, AsyncTrainingHistory
 
-async def get_current_user(
+async def _authenticate(
     authorization: str = Header(default=None, alias="Authorization"), 
     db: Session = Depends(get_db)
-):
+) -> Tuple[AuthUser, Optional[User]]:
+    """The caller's identity, plus their users row when this request had to load it"""
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -28,7 +34,18 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    # Identity from the token claims or the per-worker cache; SELECT only on a miss
+    row = None
+    user = AuthUser.from_claims(user_id, payload) if settings.AUTH_TOKEN_CLAIMS else None
+    if user is None:
+        user = auth_user_cache.get(user_id)
+    if user is None:
+        # Whole row: the row and state dependencies below reuse it
+        row = db.query(User).filter(User.id == user_id).first()
+        if row:
+            user = AuthUser.from_row(row)
+            auth_user_cache.put(user)
+
     if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -36,12 +53,82 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    return user, row
+
+async def get_current_user(auth: Tuple[AuthUser, Optional[User]] = Depends(_authenticate)) -> AuthUser:
+    return auth[0]
+
+def get_current_user_row(
+    auth: Tuple[AuthUser, Optional[User]] = Depends(_authenticate),
+    db: Session = Depends(get_db)
+) -> User:
+    """Full users row, for routes that need columns beyond the user state"""
+    current_user, user = auth
+    # Already loaded when the identity wasn't cached, otherwise one SELECT
+    if user is None:
+        user = db.get(User, current_user.id)
+    if not user or not user.is_active:
+        auth_user_cache.invalidate(current_user.id)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User inactive",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    # Fresh anyway, so refresh the cached identity
+    auth_user_cache.put(AuthUser.from_row(user))
     return user
 
-def admin_required(user: User = Depends(get_current_user)):
+def get_user_state(
+    auth: Tuple[AuthUser, Optional[User]] = Depends(_authenticate),
+    db: Session = Depends(get_read_db)
+) -> UserState:
+    """
+    History version, archive watermark and calendar - cached per worker, no
+    SELECT when warm. Read where the history engines read (the replica when
+    configured), so a cached result or ETag is never keyed by a version
+    newer than the rows it was computed from.
+    """
+    current_user, row = auth
+    state = user_state_cache.get(current_user.id)
+    if state is None:
+        on_primary = db.get_bind() is engine
+        # The row _authenticate loaded is the primary's - only reuse it when the reads go there too
+        if row is not None and on_primary:
+            state = UserState.from_row(row)
+        else:
+            state = load_user_state(db, current_user.id)
+        # Fresh from the database, so also catch a deactivation the identity cache hasn't seen
+        if state is None or not state.is_active:
+            auth_user_cache.invalidate(current_user.id)
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User inactive",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        # Replica outage (reads fell back to the primary): don't let the primary's
+        # version outlive it and key results read from a lagging replica later
+        if not on_primary or read_engine is engine:
+            user_state_cache.put(state)
+    return state
+
+def admin_required(user: AuthUser = Depends(get_current_user)):
     if not user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin only"
         )
     return user
+
+def get_training_history(
+    db: Session = Depends(get_read_db),
+    state: UserState = Depends(get_user_state)
+) -> TrainingHistory:
+    """One shared training-history snapshot per request (read replica when configured)"""
+    return TrainingHistory(db, state.id, state)
+
+def get_async_training_history(
+    db: AsyncSession = Depends(get_async_read_db),
+    state: UserState = Depends(get_user_state)
+) -> AsyncTrainingHistory:
+    """Training-history snapshot whose queries are awaited on the async engine (read replica when configured)"""
+    return AsyncTrainingHistory(db, state.id, state)
@@ -0,0 +1,134 @@
+"""
+📖 In-Memory Exercise Catalog
+The active exercise list is small and changes only through the admin
+routes, so it is loaded once per process into slotted records and served
+from memory, with a muscle category (+ exercise type) -> exercises index so
+recommendation candidates cost O(group size). Admin create/delete bump the
+catalog version, which makes the next lookup reload it (one SELECT). A TTL
+reload also picks up changes made by other workers or CLI scripts. The
+content digest backs the catalog ETag.
+"""
+
+import hashlib
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import Exercise
+
+def _type_key(exercise_type) -> Optional[str]:
+    """Index key for an ExerciseType member or its string value"""
+    return getattr(exercise_type, "value", exercise_type)
+
+class CatalogExercise:
+    """Read-only snapshot of one active exercise (same fields as ExerciseResponse)"""
+
+    __slots__ = (
+        "id", "name", "description", "exercise_type", "muscle_group",
+        "muscle_category", "equipment_required", "is_active", "created_at"
+    )
+
+    def __init__(self, row):
+        from app.recommendation import MuscleTracker
+
+        self.id = row.id
+        self.name = row.name
+        self.description = row.description
+        self.exercise_type = row.exercise_type
+        self.muscle_group = row.muscle_group
+        # Rows created before the category backfill are classified here
+        self.muscle_category = row.muscle_category or (
+            MuscleTracker.classify_muscle_group(row.muscle_group) if row.muscle_group else None
+        )
+        self.equipment_required = row.equipment_required
+        self.is_active = True
+        self.created_at = row.created_at
+
+class ExerciseCatalog:
+    """Process-wide catalog of active exercises, reloaded when its version changes"""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+        self._loaded_version = -1
+        self._loaded_at = 0.0
+        self._digest = ""
+        self._lock = threading.Lock()
+        self._exercises: Tuple[CatalogExercise, ...] = ()
+        self._by_id: Dict[int, CatalogExercise] = {}
+        # (muscle category, exercise type or None for any) -> exercises in id order
+        self._by_muscle: Dict[Tuple[str, Optional[str]], Tuple[CatalogExercise, ...]] = {}
+        self._by_type: Dict[Optional[str], Tuple[CatalogExercise, ...]] = {}
+
+    def bump(self) -> None:
+        """Mark the catalog stale (call after committing an exercise change)"""
+        with self._lock:
+            self.version += 1
+
+    def _ensure_loaded(self, db: Session) -> None:
+        now = time.monotonic()
+        if self._loaded_version == self.version and now - self._loaded_at < self.ttl_seconds:
+            return
+        with self._lock:
+            version = self.version
+            if self._loaded_version == version and now - self._loaded_at < self.ttl_seconds:
+                return
+            rows = db.query(
+                Exercise.id,
+                Exercise.name,
+                Exercise.description,
+                Exercise.exercise_type,
+                Exercise.muscle_group,
+                Exercise.muscle_category,
+                Exercise.equipment_required,
+                Exercise.created_at
+            ).filter(Exercise.is_active == True).order_by(Exercise.id.asc()).all()
+
+            exercises = tuple(CatalogExercise(row) for row in rows)
+            # Content hash, so every worker derives the same ETag for the same catalog
+            digest = hashlib.sha1(repr([tuple(row) for row in rows]).encode()).hexdigest()
+            by_muscle: Dict[Tuple[str, Optional[str]], List[CatalogExercise]] = {}
+            by_type: Dict[Optional[str], List[CatalogExercise]] = {}
+            for exercise in exercises:
+                by_type.setdefault(_type_key(exercise.exercise_type), []).append(exercise)
+                if exercise.muscle_category:
+                    by_muscle.setdefault((exercise.muscle_category, None), []).append(exercise)
+                    by_muscle.setdefault((exercise.muscle_category, _type_key(exercise.exercise_type)), []).append(exercise)
+
+            # Swap whole structures so readers never see a half-built catalog;
+            # tuples so callers can't mutate the shared index
+            self._exercises = exercises
+            self._by_id = {exercise.id: exercise for exercise in exercises}
+            self._by_muscle = {key: tuple(group) for key, group in by_muscle.items()}
+            self._by_type = {key: tuple(group) for key, group in by_type.items()}
+            self._digest = digest
+            self._loaded_version = version
+            self._loaded_at = now
+
+    def all(self, db: Session) -> Tuple[CatalogExercise, ...]:
+        """Active exercises in id order"""
+        self._ensure_loaded(db)
+        return self._exercises
+
+    def digest(self, db: Session) -> str:
+        """Hash of the active catalog contents (changes whenever an exercise does)"""
+        self._ensure_loaded(db)
+        return self._digest
+
+    def get(self, db: Session, exercise_id: int) -> Optional[CatalogExercise]:
+        """Active exercise by id (None if missing or deleted)"""
+        self._ensure_loaded(db)
+        return self._by_id.get(exercise_id)
+
+    def by_muscle(self, db: Session, muscle_category: str, exercise_type=None) -> Tuple[CatalogExercise, ...]:
+        """Active exercises for a muscle category in id order, optionally of one exercise type"""
+        self._ensure_loaded(db)
+        return self._by_muscle.get((muscle_category, _type_key(exercise_type)), ())
+
+    def by_type(self, db: Session, exercise_type) -> Tuple[CatalogExercise, ...]:
+        """Active exercises of one exercise type in id order"""
+        self._ensure_loaded(db)
+        return self._by_type.get(_type_key(exercise_type), ())
+
+exercise_catalog = ExerciseCatalog(settings.EXERCISE_CATALOG_TTL_SECONDS)
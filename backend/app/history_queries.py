@@ -0,0 +1,352 @@
+"""
+⚡ Column-Projection History Queries
+Select only the scalar columns the analytics engines read and return
+lightweight rows instead of Workout/WorkoutExercise/Exercise entities
+(no identity map, no lazy relationships, one tuple per row). Long-range
+reads also scan the archive tables once the user has archived rows.
+"""
+
+from datetime import date, datetime
+from typing import Dict, List, NamedTuple, Optional
+from sqlalchemy import Date, func, or_, select, union
+from sqlalchemy.orm import Session
+from app.models import Exercise, TrainingDaySummary, ExerciseProgress, ensure_utc
+from app.workout_archive import history_tables
+
+class WorkoutRow(NamedTuple):
+    """One completed workout (times normalized to UTC)"""
+    id: int
+    start_time: Optional[datetime]
+    end_time: Optional[datetime]
+
+    @property
+    def date(self) -> Optional[date]:
+        return self.start_time.date() if self.start_time else None
+
+class SetRow(NamedTuple):
+    """One logged exercise entry joined with its workout time and exercise info"""
+    workout_id: int
+    start_time: Optional[datetime]
+    end_time: Optional[datetime]
+    exercise_id: int
+    name: str
+    muscle_group: Optional[str]
+    exercise_type: Optional[str]
+    sets: Optional[int]
+    reps: Optional[int]
+    weight_kg: Optional[float]
+
+    @property
+    def date(self) -> Optional[date]:
+        return self.start_time.date() if self.start_time else None
+
+class MuscleActivityRow(NamedTuple):
+    """Per-muscle-category entry count and most recent completion time"""
+    muscle_category: str
+    entry_count: int
+    last_trained: Optional[datetime]
+
+class DaySummaryRow(NamedTuple):
+    """One training_day_summary row"""
+    date: date
+    session_count: int
+    total_sets: int
+    total_volume_kg: float
+    calories: int
+    muscle_sets: Dict[str, int]
+    muscle_entries: Dict[str, int]
+
+class WindowTotals(NamedTuple):
+    """Training totals between two dates"""
+    training_days: int
+    sessions: int
+    total_sets: int
+    total_volume_kg: float
+    calories: int
+    muscle_sets: Dict[str, int]
+    muscle_entries: Dict[str, int]
+
+class ExerciseProgressRow(NamedTuple):
+    """One exercise_progress row with its exercise name"""
+    exercise_id: int
+    name: str
+    muscle_group: Optional[str]
+    date: date
+    best_e1rm: float
+    top_weight: float
+    best_weight: Optional[float]
+    reps: Optional[int]
+    sets: int
+
+def fetch_workout_rows(db: Session,
+                       user_id: int,
+                       since: Optional[datetime] = None,
+                       archived_before: Optional[datetime] = None) -> List[WorkoutRow]:
+    """Completed workouts for a user, oldest first (archive included only when reachable)"""
+    rows = []
+    tables = history_tables(archived_before, since)
+    for workout_model, _ in tables:
+        query = db.query(
+            workout_model.id,
+            workout_model.start_time,
+            workout_model.end_time
+        ).filter(
+            workout_model.user_id == user_id,
+            workout_model.end_time.isnot(None)
+        )
+        if since is not None:
+            query = query.filter(workout_model.start_time >= since)
+
+        rows.extend(
+            WorkoutRow(workout_id, ensure_utc(start_time), ensure_utc(end_time))
+            for workout_id, start_time, end_time
+            in query.order_by(workout_model.start_time.asc(), workout_model.id.asc())
+        )
+
+    if len(tables) > 1:
+        rows.sort(key=lambda row: (row.start_time, row.id))
+    return rows
+
+def fetch_set_rows(db: Session,
+                   user_id: int,
+                   since: Optional[datetime] = None,
+                   archived_before: Optional[datetime] = None) -> List[SetRow]:
+    """Exercise entries from a user's completed workouts, oldest first"""
+    rows = []
+    tables = history_tables(archived_before, since)
+    for workout_model, entry_model in tables:
+        query = db.query(
+            workout_model.id,
+            workout_model.start_time,
+            workout_model.end_time,
+            entry_model.exercise_id,
+            Exercise.name,
+            Exercise.muscle_group,
+            Exercise.exercise_type,
+            entry_model.sets,
+            entry_model.reps,
+            entry_model.weight_kg,
+            entry_model.id
+        ).join(
+            entry_model, entry_model.workout_id == workout_model.id
+        ).join(
+            Exercise, Exercise.id == entry_model.exercise_id
+        ).filter(
+            workout_model.user_id == user_id,
+            workout_model.end_time.isnot(None)
+        )
+        if since is not None:
+            query = query.filter(workout_model.start_time >= since)
+
+        rows.extend(
+            (SetRow(
+                row[0], ensure_utc(row[1]), ensure_utc(row[2]),
+                row[3], row[4], row[5], row[6], row[7], row[8], row[9]
+            ), row[10])
+            for row in query.order_by(
+                workout_model.start_time.asc(), workout_model.id.asc(), entry_model.id.asc()
+            )
+        )
+
+    if len(tables) > 1:
+        rows.sort(key=lambda pair: (pair[0].start_time, pair[0].workout_id, pair[1]))
+    return [row for row, _ in rows]
+
+def fetch_muscle_activity(db: Session,
+                          user_id: int,
+                          since: Optional[datetime] = None,
+                          archived_before: Optional[datetime] = None) -> List[MuscleActivityRow]:
+    """
+    Entry counts and last-trained times per muscle category in one GROUP BY
+    (one per table when the archive is reachable).
+    Entries without a muscle_group are skipped; rows whose category was never
+    backfilled are classified here as a fallback. Ordered by first appearance.
+    """
+    from app.recommendation import MuscleTracker
+
+    rows = []
+    tables = history_tables(archived_before, since)
+    for workout_model, entry_model in tables:
+        query = db.query(
+            Exercise.muscle_category,
+            Exercise.muscle_group,
+            func.count(entry_model.id),
+            func.max(workout_model.end_time),
+            func.min(workout_model.start_time)
+        ).join(
+            entry_model, entry_model.workout_id == workout_model.id
+        ).join(
+            Exercise, Exercise.id == entry_model.exercise_id
+        ).filter(
+            workout_model.user_id == user_id,
+            workout_model.end_time.isnot(None),
+            Exercise.muscle_group.isnot(None),
+            Exercise.muscle_group != ""
+        )
+        if since is not None:
+            query = query.filter(workout_model.start_time >= since)
+
+        rows.extend(query.group_by(
+            Exercise.muscle_category, Exercise.muscle_group
+        ).order_by(func.min(workout_model.start_time)).all())
+
+    if len(tables) > 1:
+        rows.sort(key=lambda row: ensure_utc(row[4]))
+
+    activity: Dict[str, list] = {}
+    for category, muscle_group, count, last_trained, _ in rows:
+        category = category or MuscleTracker.classify_muscle_group(muscle_group)
+        last_trained = ensure_utc(last_trained)
+        if category not in activity:
+            activity[category] = [count, last_trained]
+        else:
+            entry = activity[category]
+            entry[0] += count
+            if last_trained and (entry[1] is None or last_trained > entry[1]):
+                entry[1] = last_trained
+
+    return [
+        MuscleActivityRow(category, count, last_trained)
+        for category, (count, last_trained) in activity.items()
+    ]
+
+def _training_date_selects(user_id: int, since: Optional[datetime], archived_before: Optional[datetime]):
+    """(day expression, filtered select) per reachable table - DATE() works on SQLite and MySQL"""
+    selects = []
+    for workout_model, _ in history_tables(archived_before, since):
+        day = func.date(workout_model.start_time, type_=Date)
+        query = select(day.label("day")).where(
+            workout_model.user_id == user_id,
+            workout_model.end_time.isnot(None)
+        )
+        if since is not None:
+            query = query.where(workout_model.start_time >= since)
+        selects.append((day, query))
+    return selects
+
+def count_training_days(db: Session,
+                        user_id: int,
+                        since: Optional[datetime] = None,
+                        archived_before: Optional[datetime] = None) -> int:
+    """COUNT(DISTINCT date(start_time)) over completed workouts - a single aggregate"""
+    selects = _training_date_selects(user_id, since, archived_before)
+    if len(selects) == 1:
+        day, query = selects[0]
+        return db.scalar(query.with_only_columns(func.count(func.distinct(day)))) or 0
+
+    # UNION (not UNION ALL) so a day with both hot and archived workouts counts once
+    days = union(*[query.group_by(day) for day, query in selects]).subquery()
+    return db.scalar(select(func.count()).select_from(days)) or 0
+
+def fetch_training_dates(db: Session,
+                         user_id: int,
+                         since: Optional[datetime] = None,
+                         archived_before: Optional[datetime] = None) -> List[date]:
+    """Distinct training dates from completed workouts (GROUP BY date), oldest first"""
+    selects = [query.group_by(day) for day, query in _training_date_selects(user_id, since, archived_before)]
+    days = (selects[0] if len(selects) == 1 else union(*selects)).subquery()
+    return [day for (day,) in db.execute(select(days.c.day).order_by(days.c.day.asc()))]
+
+def fetch_day_summaries(db: Session, user_id: int, since: Optional[date] = None) -> List[DaySummaryRow]:
+    """Daily rollup rows for a user, oldest first"""
+    query = db.query(
+        TrainingDaySummary.date,
+        TrainingDaySummary.session_count,
+        TrainingDaySummary.total_sets,
+        TrainingDaySummary.total_volume_kg,
+        TrainingDaySummary.calories,
+        TrainingDaySummary.muscle_sets,
+        TrainingDaySummary.muscle_entries
+    ).filter(
+        TrainingDaySummary.user_id == user_id,
+        TrainingDaySummary.session_count > 0
+    )
+    if since is not None:
+        query = query.filter(TrainingDaySummary.date >= since)
+
+    return [
+        DaySummaryRow(day, sessions, sets, volume or 0.0, calories or 0, muscle_sets or {}, muscle_entries or {})
+        for day, sessions, sets, volume, calories, muscle_sets, muscle_entries
+        in query.order_by(TrainingDaySummary.date.asc())
+    ]
+
+def _muscle_difference(end: Optional[Dict[str, int]], start: Optional[Dict[str, int]]) -> Dict[str, int]:
+    start = start or {}
+    window = {muscle: count - start.get(muscle, 0) for muscle, count in (end or {}).items()}
+    return {muscle: count for muscle, count in window.items() if count}
+
+def fetch_window_totals(db: Session,
+                        user_id: int,
+                        since: Optional[date] = None,
+                        until: Optional[date] = None) -> WindowTotals:
+    """
+    Training totals from since to until (both inclusive, None = open-ended).
+    One query reading two running-total rows - the last day on or before
+    until and the last day before since - whatever the window length.
+    """
+    day = TrainingDaySummary.date
+    end_day = select(func.max(day)).where(TrainingDaySummary.user_id == user_id)
+    if until is not None:
+        end_day = end_day.where(day <= until)
+    bounds = [day == end_day.scalar_subquery()]
+    if since is not None:
+        start_day = select(func.max(day)).where(TrainingDaySummary.user_id == user_id, day < since)
+        bounds.append(day == start_day.scalar_subquery())
+
+    rows = db.query(
+        day,
+        TrainingDaySummary.cum_training_days,
+        TrainingDaySummary.cum_sessions,
+        TrainingDaySummary.cum_sets,
+        TrainingDaySummary.cum_volume_kg,
+        TrainingDaySummary.cum_calories,
+        TrainingDaySummary.cum_muscle_sets,
+        TrainingDaySummary.cum_muscle_entries
+    ).filter(
+        TrainingDaySummary.user_id == user_id,
+        or_(*bounds)
+    ).order_by(day.asc()).all()
+
+    # No training day on or before until that is also on or after since: empty window
+    if not rows or (since is not None and rows[-1].date < since):
+        return WindowTotals(0, 0, 0, 0.0, 0, {}, {})
+    end = rows[-1]
+    start = rows[0] if since is not None and rows[0].date < since else None
+
+    def diff(index: int):
+        return (end[index] or 0) - ((start[index] or 0) if start is not None else 0)
+
+    return WindowTotals(
+        training_days=diff(1),
+        sessions=diff(2),
+        total_sets=diff(3),
+        total_volume_kg=round(diff(4), 2),
+        calories=diff(5),
+        muscle_sets=_muscle_difference(end[6], start[6] if start is not None else None),
+        muscle_entries=_muscle_difference(end[7], start[7] if start is not None else None)
+    )
+
+def fetch_exercise_progress(db: Session, user_id: int, since: Optional[date] = None) -> List[ExerciseProgressRow]:
+    """Per-exercise daily e1RM series for a user, oldest first"""
+    query = db.query(
+        ExerciseProgress.exercise_id,
+        Exercise.name,
+        Exercise.muscle_group,
+        ExerciseProgress.date,
+        ExerciseProgress.best_e1rm,
+        ExerciseProgress.top_weight,
+        ExerciseProgress.best_weight,
+        ExerciseProgress.reps,
+        ExerciseProgress.sets
+    ).join(
+        Exercise, Exercise.id == ExerciseProgress.exercise_id
+    ).filter(
+        ExerciseProgress.user_id == user_id
+    )
+    if since is not None:
+        query = query.filter(ExerciseProgress.date >= since)
+
+    return [
+        ExerciseProgressRow(*row)
+        for row in query.order_by(ExerciseProgress.date.asc(), ExerciseProgress.exercise_id.asc())
+    ]
@@ -0,0 +1,79 @@
+"""
+🏷️ Conditional GET (ETags)
+Catalog and analytics responses only change when the exercise catalog or
+the user's history changes, so their ETags come from the catalog digest and
+users.history_version rather than from the body. The ETag dependencies run
+before the handler: a matching If-None-Match gets a 304 without loading
+history or running any engine.
+"""
+
+import hashlib
+from typing import Optional
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session
+from app.analytics_cache import freshness_window
+from app.config import settings
+from app.database import get_db
+from app.dependencies import get_user_state
+from app.exercise_catalog import exercise_catalog
+from app.user_state import UserState
+
+# Per-user results: browsers may keep them but must revalidate (a 304 is cheap)
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+def make_etag(*parts) -> str:
+    """Strong ETag from the values a response is derived from"""
+    return '"' + hashlib.sha1(repr(parts).encode()).hexdigest()[:24] + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 specifies for it)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+def _request_key(request: Request):
+    """Path + query string, so every parameter combination gets its own ETag"""
+    return request.url.path, tuple(sorted(request.query_params.multi_items()))
+
+def _conditional(request: Request, response: Response, etag: str, cache_control: str, vary: Optional[str] = None):
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if vary:
+        headers["Vary"] = vary
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+# --------------------------------------------------
+# DEPENDENCIES
+# --------------------------------------------------
+def catalog_etag(request: Request, response: Response, db: Session = Depends(get_db)):
+    """ETag for exercise catalog reads (same on every worker for the same catalog)"""
+    if not settings.ETAG_ENABLED:
+        return
+    etag = make_etag("catalog", exercise_catalog.digest(db), _request_key(request))
+    _conditional(request, response, etag, f"public, max-age={settings.CATALOG_MAX_AGE_SECONDS}")
+
+def history_etag(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    state: UserState = Depends(get_user_state)
+):
+    """
+    ETag for per-user analytics. Changes with the user's history version, the
+    catalog (recommendations name exercises) and the analytics freshness
+    window (results mention "now"). The version comes from the cached user
+    state, so a warm 304 runs no query.
+    """
+    if not settings.ETAG_ENABLED:
+        return
+    etag = make_etag(
+        "history",
+        state.id,
+        state.history_version,
+        exercise_catalog.digest(db),
+        freshness_window(),
+        _request_key(request)
+    )
+    _conditional(request, response, etag, PRIVATE_CACHE_CONTROL, vary="Authorization")
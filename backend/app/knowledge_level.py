@@ -7,7 +7,10 @@ from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Tuple
 from enum import Enum
 from sqlalchemy.orm import Session
-from app.models import Workout, User, WorkoutExercise, Exercise
+from app.models import Workout, User, WorkoutExercise
+from app.training_history import TrainingHistory
+from app.analytics_cache import cached_analytics
+from app.exercise_catalog import exercise_catalog
 
 class KnowledgeLevel(str, Enum):
     NOVICE = "novice"        # < 30 days, inconsistent
@@ -54,25 +57,19 @@ class KnowledgeAssessor:
         }
     }
     
-    def __init__(self, db: Session, user_id: int):
-        self.db = db
-        self.user_id = user_id
-        self.now = datetime.now(timezone.utc)
+    def __init__(self, history: TrainingHistory):
+        self.history = history
+        self.db = history.db
+        self.user_id = history.user_id
+        self.now = history.now
     
     def get_user_training_age_days(self) -> int:
         """How many days since first workout"""
-        first_workout = self.db.query(Workout).filter(
-            Workout.user_id == self.user_id,
-            Workout.end_time.isnot(None)
-        ).order_by(Workout.start_time.asc()).first()
+        first_date = self.history.first_workout_at
         
-        if not first_workout:
+        if not first_date:
             return 0
         
-        first_date = first_workout.start_time or first_workout.end_time
-        if first_date.tzinfo is None:
-            first_date = first_date.replace(tzinfo=timezone.utc)
-        
         days = (self.now - first_date).days
         return max(0, days)
     
@@ -84,24 +81,13 @@ class KnowledgeAssessor:
         """
         cutoff = self.now - timedelta(days=days_lookback)
         
-        # Get all completed workouts in period
-        workouts = self.db.query(Workout).filter(
-            Workout.user_id == self.user_id,
-            Workout.end_time.isnot(None),
-            Workout.start_time >= cutoff
-        ).all()
+        # Training days in period - a popcount over the user's calendar bitset
+        training_days = self.history.calendar().count(cutoff.date(), self.now.date())
         
-        if not workouts:
+        if not training_days:
             return 0.0
         
-        # Count unique training days
-        training_days = set()
-        for workout in workouts:
-            if workout.start_time:
-                date = workout.start_time.date()
-                training_days.add(date)
-        
-        consistency = len(training_days) / days_lookback
+        consistency = training_days / days_lookback
         return min(consistency, 1.0)
     
     def get_progression_quality(self) -> float:
@@ -109,24 +95,18 @@ class KnowledgeAssessor:
         Assess quality of progressive overload (0-1)
         Looks at weight increases over time
         """
-        # Get all strength exercises with weight tracking
-        strength_workouts = self.db.query(WorkoutExercise).join(Workout).join(Exercise).filter(
-            Workout.user_id == self.user_id,
-            Workout.end_time.isnot(None),
-            Exercise.exercise_type == "strength",
-            WorkoutExercise.weight_kg.isnot(None),
-            WorkoutExercise.weight_kg > 0
-        ).order_by(Workout.start_time.asc()).all()
+        # Daily top weight per strength exercise (exercise_progress series)
+        progress_rows = self.history.exercise_progress()
         
-        if len(strength_workouts) < 4:  # Need enough data
+        if len(progress_rows) < 4:  # Need enough data
             return 0.5  # Neutral
         
         # Group by exercise and track progression
         exercise_progress = {}
-        for w_ex in strength_workouts:
-            if w_ex.exercise_id not in exercise_progress:
-                exercise_progress[w_ex.exercise_id] = []
-            exercise_progress[w_ex.exercise_id].append(w_ex.weight_kg)
+        for row in progress_rows:
+            if row.exercise_id not in exercise_progress:
+                exercise_progress[row.exercise_id] = []
+            exercise_progress[row.exercise_id].append(row.top_weight)
         
         # Calculate progression scores
         progression_scores = []
@@ -146,6 +126,7 @@ class KnowledgeAssessor:
         
         return sum(progression_scores) / len(progression_scores)
     
+    @cached_analytics("knowledge_level")
     def assess_knowledge_level(self) -> Tuple[KnowledgeLevel, Dict]:
         """
         Assess user's current knowledge level
@@ -203,22 +184,17 @@ class KnowledgeAssessor:
         warnings = []
         
         # Check weekly frequency (simplified)
-        recent_workouts = self.db.query(Workout).filter(
-            Workout.user_id == self.user_id,
-            Workout.end_time.isnot(None),
-            Workout.start_time >= self.now - timedelta(days=7)
-        ).count()
+        recent_workouts = len(self.history.workouts_since(self.now - timedelta(days=7)))
         
         if recent_workouts >= thresholds["max_sessions_per_week"]:
             warnings.append(f"High frequency: {recent_workouts} sessions this week (max: {thresholds['max_sessions_per_week']})")
         
-        # Check muscle group volume in planned workout
+        # Check muscle group volume in planned workout (catalog lookups, no queries)
         muscle_sets = {}
         for ex in planned_workout.get("exercises", []):
-            exercise = self.db.query(Exercise).filter(Exercise.id == ex["exercise_id"]).first()
-            if exercise and exercise.muscle_group:
-                from app.recommendation import MuscleTracker
-                muscle = MuscleTracker.classify_muscle_group(exercise.muscle_group)
+            exercise = exercise_catalog.get(self.db, ex["exercise_id"])
+            if exercise and exercise.muscle_category:
+                muscle = exercise.muscle_category
                 muscle_sets[muscle] = muscle_sets.get(muscle, 0) + ex.get("sets", 0)
         
         for muscle, sets in muscle_sets.items():
@@ -1,11 +1,15 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.config import settings
 from app.database import Base, engine
+from app.migrations import run_migrations
+from app.query_budget import install_query_debug
 from app.routes import auth, admin, system, exercise, workout, recommendation, intelligence
 # Use the simple working version
 from app.routes.progress_simple_working import router as progress_router
 
 Base.metadata.create_all(bind=engine)
+run_migrations(engine)
 
 app = FastAPI(
     title="Flab2Fabs API",
@@ -31,6 +35,10 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Dev/test: per-request query counts, N+1 warnings and budgets
+if settings.QUERY_DEBUG:
+    install_query_debug(app)
+
 # Include all routers
 app.include_router(auth.router)
 app.include_router(admin.router)
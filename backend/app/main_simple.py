@@ -1,9 +1,13 @@
 from fastapi import FastAPI
+from app.config import settings
 from app.database import Base, engine
+from app.migrations import run_migrations
+from app.query_budget import install_query_debug
 from app.routes import auth, admin, system, exercise, workout, recommendation, intelligence
 from app.routes.progress_simple import router as progress_simple_router
 
 Base.metadata.create_all(bind=engine)
+run_migrations(engine)
 
 app = FastAPI(
     title="Flab2Fabs API - Simple Test",
@@ -11,6 +15,10 @@ app = FastAPI(
     version="3.0.0"
 )
 
+# Dev/test: per-request query counts, N+1 warnings and budgets
+if settings.QUERY_DEBUG:
+    install_query_debug(app)
+
 app.include_router(auth.router)
 app.include_router(admin.router)
 app.include_router(system.router)
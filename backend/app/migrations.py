@@ -0,0 +1,194 @@
+"""
+🗄️ Versioned Schema Migrations
+Base.metadata.create_all only creates missing tables - it never alters
+existing ones. Each step here runs once per database, in order, and the
+applied version is recorded in the schema_version table.
+
+Run manually with: python -m app.migrations
+"""
+
+from datetime import datetime, timezone
+from typing import Callable, List, Tuple
+from sqlalchemy import MetaData, Table, Column, Integer, String, DateTime, select, update, func, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from app.models import User, Workout, WorkoutExercise, Exercise, TrainingDaySummary, ExerciseProgress
+from app.recommendation import MuscleTracker
+from app.training_rollups import (
+    accumulate_day_totals,
+    rebuild_best_weights,
+    rebuild_day_summaries,
+    rebuild_exercise_progress,
+    rebuild_training_calendars,
+    rebuild_workout_stats
+)
+
+_metadata = MetaData()
+
+schema_version = Table(
+    "schema_version",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(200)),
+    Column("applied_at", DateTime(timezone=True)),
+)
+
+# (version, description, step) - append only, never renumber
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = []
+
+def migration(version: int, description: str):
+    """Register a migration step"""
+    def decorator(fn: Callable[[Connection], None]):
+        MIGRATIONS.append((version, description, fn))
+        return fn
+    return decorator
+
+# --------------------------------------------------
+# HELPERS
+# --------------------------------------------------
+def _create_indexes(conn: Connection, table) -> None:
+    """Create any declared index missing from an existing table"""
+    existing = {ix["name"] for ix in inspect(conn).get_indexes(table.name)}
+    for index in table.indexes:
+        if index.name not in existing:
+            index.create(bind=conn)
+
+def _add_column(conn: Connection, table, column_name: str) -> bool:
+    """Add a model column to an existing table. Returns False if it was already there."""
+    existing = {col["name"] for col in inspect(conn).get_columns(table.name)}
+    if column_name in existing:
+        return False
+    column = table.c[column_name]
+    column_type = column.type.compile(dialect=conn.dialect)
+    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+    return True
+
+# --------------------------------------------------
+# MIGRATIONS
+# --------------------------------------------------
+@migration(1, "Indexes for hot workout queries")
+def _add_workout_indexes(conn: Connection) -> None:
+    _create_indexes(conn, Workout.__table__)
+    _create_indexes(conn, WorkoutExercise.__table__)
+
+@migration(2, "Persisted muscle classification on exercises")
+def _add_exercise_muscle_category(conn: Connection) -> None:
+    exercises = Exercise.__table__
+    _add_column(conn, exercises, "muscle_category")
+    _create_indexes(conn, exercises)
+
+    # Backfill - one UPDATE per distinct muscle_group string
+    muscle_groups = conn.execute(select(exercises.c.muscle_group).distinct()).scalars().all()
+    for muscle_group in muscle_groups:
+        match = exercises.c.muscle_group.is_(None) if muscle_group is None else exercises.c.muscle_group == muscle_group
+        conn.execute(
+            update(exercises)
+            .where(match)
+            .values(muscle_category=MuscleTracker.classify_muscle_group(muscle_group))
+        )
+
+@migration(3, "Backfill training_day_summary rollups")
+def _backfill_training_days(conn: Connection) -> None:
+    db = Session(bind=conn)
+    rebuild_day_summaries(db)
+    db.flush()
+    db.close()
+
+@migration(4, "Archive watermark on users")
+def _add_user_archived_before(conn: Connection) -> None:
+    _add_column(conn, User.__table__, "archived_before")
+
+@migration(5, "Backfill exercise_progress e1RM series")
+def _backfill_exercise_progress(conn: Connection) -> None:
+    db = Session(bind=conn)
+    rebuild_exercise_progress(db)
+    db.flush()
+    db.close()
+
+@migration(6, "First/last workout times and completed count on users")
+def _add_user_workout_stats(conn: Connection) -> None:
+    users = User.__table__
+    for column_name in ("first_workout_at", "last_workout_at", "completed_workout_count"):
+        _add_column(conn, users, column_name)
+
+    db = Session(bind=conn)
+    rebuild_workout_stats(db)
+    db.flush()
+    db.close()
+
+@migration(7, "Training-day bitset calendar on users")
+def _add_user_training_calendar(conn: Connection) -> None:
+    users = User.__table__
+    _add_column(conn, users, "calendar_start")
+    _add_column(conn, users, "training_calendar")
+
+    db = Session(bind=conn)
+    rebuild_training_calendars(db)
+    db.flush()
+    db.close()
+
+@migration(8, "History version on users")
+def _add_user_history_version(conn: Connection) -> None:
+    users = User.__table__
+    if _add_column(conn, users, "history_version"):
+        conn.execute(update(users).values(history_version=0))
+
+@migration(9, "Running totals on training_day_summary")
+def _add_day_running_totals(conn: Connection) -> None:
+    summary = TrainingDaySummary.__table__
+    for column_name in (
+        "cum_training_days", "cum_sessions", "cum_sets", "cum_volume_kg",
+        "cum_calories", "cum_muscle_sets", "cum_muscle_entries"
+    ):
+        _add_column(conn, summary, column_name)
+
+    db = Session(bind=conn)
+    accumulate_day_totals(db)
+    db.flush()
+    db.close()
+
+@migration(10, "Best-set weight on exercise_progress")
+def _add_progress_best_weight(conn: Connection) -> None:
+    if not _add_column(conn, ExerciseProgress.__table__, "best_weight"):
+        return
+
+    db = Session(bind=conn)
+    rebuild_best_weights(db)
+    db.flush()
+    db.close()
+
+# --------------------------------------------------
+# RUNNER
+# --------------------------------------------------
+def get_current_version(conn: Connection) -> int:
+    """Highest applied migration version (0 for a fresh database)"""
+    return conn.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+def run_migrations(engine: Engine) -> int:
+    """Apply pending migrations, each in its own transaction. Returns the final version."""
+    _metadata.create_all(bind=engine)
+
+    with engine.connect() as conn:
+        current = get_current_version(conn)
+
+    for version, description, step in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if version <= current:
+            continue
+        with engine.begin() as conn:
+            step(conn)
+            conn.execute(schema_version.insert().values(
+                version=version,
+                description=description,
+                applied_at=datetime.now(timezone.utc)
+            ))
+        print(f"✅ Applied migration {version}: {description}")
+        current = version
+
+    return current
+
+if __name__ == "__main__":
+    from app.database import Base, engine
+
+    Base.metadata.create_all(bind=engine)
+    version = run_migrations(engine)
+    print(f"Schema version: {version}")
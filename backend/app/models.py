@@ -4,10 +4,14 @@ from sqlalchemy import (
     String,
     Boolean,
     DateTime,
+    Date,
     Float,
     ForeignKey,
     Text,
-    Enum
+    Enum,
+    Index,
+    JSON,
+    LargeBinary
 )
 from sqlalchemy.orm import relationship
 import enum
@@ -24,6 +28,17 @@ def utcnow():
     """
     return datetime.now(timezone.utc)
 
+def ensure_utc(value):
+    """
+    Normalize a stored datetime to timezone-aware UTC.
+    SQLite hands back naive datetimes even for timezone=True columns.
+    """
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
 # --------------------------------------------------
 # USER MODEL
 # --------------------------------------------------
@@ -40,6 +55,20 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), default=utcnow)
     last_login = Column(DateTime(timezone=True), nullable=True)
 
+    # Completed workouts starting before this live in the archive tables
+    archived_before = Column(DateTime(timezone=True), nullable=True)
+
+    # Completed-workout stats (archived ones included), kept by training_rollups
+    first_workout_at = Column(DateTime(timezone=True), nullable=True)
+    last_workout_at = Column(DateTime(timezone=True), nullable=True)
+    completed_workout_count = Column(Integer, default=0)
+    # Training-day bitset (bit i = calendar_start + i days), see training_calendar
+    calendar_start = Column(Date, nullable=True)
+    training_calendar = Column(LargeBinary, nullable=True)
+
+    # Bumped whenever the workout history changes - keys the analytics cache
+    history_version = Column(Integer, default=0)
+
     # Relationships
     workouts = relationship(
         "Workout",
@@ -67,6 +96,8 @@ class Exercise(Base):
     description = Column(Text, nullable=True)
     exercise_type = Column(Enum(ExerciseType))
     muscle_group = Column(String(100), nullable=True)
+    # MuscleTracker.classify_muscle_group(muscle_group), persisted for SQL-side grouping
+    muscle_category = Column(String(20), nullable=True, index=True)
     equipment_required = Column(String(100), nullable=True)
 
     created_by_admin_id = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -85,6 +116,10 @@ class Exercise(Base):
 # --------------------------------------------------
 class Workout(Base):
     __tablename__ = "workouts"
+    __table_args__ = (
+        # Every engine filters by user, completion and a start_time window
+        Index("ix_workouts_user_start_end", "user_id", "start_time", "end_time"),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -114,8 +149,8 @@ class WorkoutExercise(Base):
     __tablename__ = "workout_exercises"
 
     id = Column(Integer, primary_key=True)
-    workout_id = Column(Integer, ForeignKey("workouts.id"))
-    exercise_id = Column(Integer, ForeignKey("exercises.id"))
+    workout_id = Column(Integer, ForeignKey("workouts.id"), index=True)
+    exercise_id = Column(Integer, ForeignKey("exercises.id"), index=True)
 
     # Exercise details
     sets = Column(Integer, nullable=True)
@@ -129,3 +164,102 @@ class WorkoutExercise(Base):
     # Relationships
     workout = relationship("Workout", back_populates="exercises")
     exercise = relationship("Exercise", back_populates="workout_exercises")
+
+# --------------------------------------------------
+# TRAINING DAY SUMMARY (ROLLUP)
+# --------------------------------------------------
+class TrainingDaySummary(Base):
+    """
+    One row per user per training day (UTC date of workout start).
+    Maintained when a workout is completed; rebuild with
+    python -m app.training_rollups rebuild
+    """
+    __tablename__ = "training_day_summary"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    date = Column(Date, primary_key=True)
+
+    session_count = Column(Integer, default=0)
+    total_sets = Column(Integer, default=0)
+    total_volume_kg = Column(Float, default=0.0)
+    calories = Column(Integer, default=0)
+
+    # {"Chest": 9, "Back": 6} - sets and logged exercise entries per muscle group
+    muscle_sets = Column(JSON, default=dict)
+    muscle_entries = Column(JSON, default=dict)
+
+    # Running totals through this date (inclusive): a window's totals are the
+    # difference of two rows, see history_queries.fetch_window_totals
+    cum_training_days = Column(Integer, default=0)
+    cum_sessions = Column(Integer, default=0)
+    cum_sets = Column(Integer, default=0)
+    cum_volume_kg = Column(Float, default=0.0)
+    cum_calories = Column(Integer, default=0)
+    cum_muscle_sets = Column(JSON, default=dict)
+    cum_muscle_entries = Column(JSON, default=dict)
+
+# --------------------------------------------------
+# EXERCISE PROGRESS (ESTIMATED 1RM SERIES)
+# --------------------------------------------------
+class ExerciseProgress(Base):
+    """
+    Best weighted strength set per user, exercise and training day
+    (UTC date of workout start). Maintained with training_day_summary
+    when a workout is completed.
+    """
+    __tablename__ = "exercise_progress"
+    __table_args__ = (
+        Index("ix_exercise_progress_user_date", "user_id", "date"),
+    )
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    exercise_id = Column(Integer, ForeignKey("exercises.id"), primary_key=True)
+    date = Column(Date, primary_key=True)
+
+    best_e1rm = Column(Float)  # Epley: weight * (1 + reps / 30)
+    top_weight = Column(Float)
+    best_weight = Column(Float)  # Weight of the best-e1RM set
+    reps = Column(Integer)  # Reps of the best-e1RM set
+    sets = Column(Integer, default=0)
+
+# --------------------------------------------------
+# COLD ARCHIVE (OLD COMPLETED WORKOUTS)
+# --------------------------------------------------
+class ArchivedWorkout(Base):
+    """
+    Completed workouts moved out of the hot table by
+    python -m app.workout_archive run (ids are kept)
+    """
+    __tablename__ = "workouts_archive"
+    __table_args__ = (
+        Index("ix_workouts_archive_user_start", "user_id", "start_time"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer, ForeignKey("users.id"))
+
+    name = Column(String(100))
+    notes = Column(Text, nullable=True)
+
+    start_time = Column(DateTime(timezone=True))
+    end_time = Column(DateTime(timezone=True), nullable=True)
+
+    total_duration_minutes = Column(Float, nullable=True)
+    calories_burned = Column(Integer, nullable=True)
+
+    archived_at = Column(DateTime(timezone=True), default=utcnow)
+
+class ArchivedWorkoutExercise(Base):
+    __tablename__ = "workout_exercises_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    workout_id = Column(Integer, ForeignKey("workouts_archive.id"), index=True)
+    exercise_id = Column(Integer, ForeignKey("exercises.id"), index=True)
+
+    sets = Column(Integer, nullable=True)
+    reps = Column(Integer, nullable=True)
+    weight_kg = Column(Float, nullable=True)
+
+    duration_minutes = Column(Float, nullable=True)
+    distance_km = Column(Float, nullable=True)
+    calories = Column(Integer, nullable=True)
@@ -10,14 +10,18 @@ from collections import defaultdict, Counter
 from sqlalchemy.orm import Session
 from app.models import Workout, WorkoutExercise, Exercise, User
 from app.recommendation import MuscleTracker
+from app.training_history import TrainingHistory
+from app.history_queries import SetRow
+from app.analytics_cache import cached_analytics
 
 class OverrideTracker:
     """Tracks when users override recommendations"""
     
-    def __init__(self, db: Session, user_id: int):
-        self.db = db
-        self.user_id = user_id
+    def __init__(self, history: TrainingHistory):
+        self.history = history
+        self.user_id = history.user_id
     
+    @cached_analytics("override_patterns")
     def analyze_override_patterns(self, days_back: int = 90) -> Dict:
         """
         Analyze patterns in user's exercise choices vs recommendations
@@ -25,32 +29,15 @@ class OverrideTracker:
         """
         # Get all workouts
         cutoff = datetime.now(timezone.utc) - timedelta(days=days_back)
-        workouts = self.db.query(Workout).filter(
-            Workout.user_id == self.user_id,
-            Workout.end_time.isnot(None),
-            Workout.start_time >= cutoff
-        ).order_by(Workout.start_time.asc()).all()
+        totals = self.history.window_totals(cutoff.date())
         
-        if not workouts:
+        if not totals.training_days:
             return {"no_data": True, "message": "No workout history to analyze"}
         
-        # Analyze muscle group distribution
-        muscle_counts = Counter()
-        muscle_preferences = defaultdict(list)
-        
-        for workout in workouts:
-            for w_ex in workout.exercises:
-                exercise = w_ex.exercise
-                if exercise and exercise.muscle_group:
-                    muscle = MuscleTracker.classify_muscle_group(exercise.muscle_group)
-                    muscle_counts[muscle] += 1
-                    muscle_preferences[muscle].append({
-                        "date": workout.start_time.date().isoformat() if workout.start_time else None,
-                        "exercise": exercise.name,
-                        "sets": w_ex.sets,
-                        "reps": w_ex.reps,
-                        "weight": w_ex.weight_kg
-                    })
+        entries = self.history.sets_since(cutoff)
+        
+        # Muscle group distribution straight from the window's running totals
+        muscle_counts = Counter(totals.muscle_entries)
         
         # Calculate distribution percentages
         total_exercises = sum(muscle_counts.values())
@@ -85,14 +72,14 @@ class OverrideTracker:
                 })
         
         # Track progression patterns
-        progression_analysis = self._analyze_progression_patterns(workouts)
+        progression_analysis = self._analyze_progression_patterns(entries)
         
         # Get most frequent exercises
-        exercise_frequency = self._get_exercise_frequency(workouts)
+        exercise_frequency = self._get_exercise_frequency(entries)
         
         return {
             "analysis_period_days": days_back,
-            "total_workouts": len(workouts),
+            "total_workouts": totals.sessions,
             "total_exercises": total_exercises,
             "muscle_distribution": {
                 "counts": dict(muscle_counts),
@@ -106,19 +93,18 @@ class OverrideTracker:
             "insights": self._generate_insights(biases, neglected, progression_analysis)
         }
     
-    def _analyze_progression_patterns(self, workouts: List[Workout]) -> Dict:
+    def _analyze_progression_patterns(self, entries: List[SetRow]) -> Dict:
         """Analyze how user progresses in exercises"""
         progression_data = defaultdict(list)
         
-        for workout in workouts:
-            for w_ex in workout.exercises:
-                if w_ex.exercise and w_ex.weight_kg:
-                    progression_data[w_ex.exercise.name].append({
-                        "date": workout.start_time.date().isoformat() if workout.start_time else None,
-                        "weight": w_ex.weight_kg,
-                        "sets": w_ex.sets,
-                        "reps": w_ex.reps
-                    })
+        for entry in entries:
+            if entry.weight_kg:
+                progression_data[entry.name].append({
+                    "date": entry.date.isoformat() if entry.date else None,
+                    "weight": entry.weight_kg,
+                    "sets": entry.sets,
+                    "reps": entry.reps
+                })
         
         # Calculate progression rates
         progression_rates = {}
@@ -174,14 +160,9 @@ class OverrideTracker:
             "slowest_progressing": min(progression_rates.items(), key=lambda x: x[1]["weekly_increase_kg"])[0] if progression_rates else None
         }
     
-    def _get_exercise_frequency(self, workouts: List[Workout]) -> List[Dict]:
+    def _get_exercise_frequency(self, entries: List[SetRow]) -> List[Dict]:
         """Get most frequently performed exercises"""
-        exercise_counter = Counter()
-        
-        for workout in workouts:
-            for w_ex in workout.exercises:
-                if w_ex.exercise:
-                    exercise_counter[w_ex.exercise.name] += 1
+        exercise_counter = Counter(entry.name for entry in entries)
         
         return [
             {"exercise": exercise, "count": count}
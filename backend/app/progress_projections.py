@@ -11,6 +11,8 @@ from app.models import Workout, WorkoutExercise, Exercise, User
 from app.recommendation import MuscleTracker
 from app.knowledge_level import KnowledgeAssessor, KnowledgeLevel
 from app.override_tracking import OverrideTracker
+from app.training_history import TrainingHistory
+from app.analytics_cache import cached_analytics
 import math
 
 @dataclass
@@ -94,15 +96,16 @@ class ProgressProjector:
         KnowledgeLevel.EXPERT: 4.0
     }
     
-    def __init__(self, db: Session, user_id: int):
-        self.db = db
-        self.user_id = user_id
-        self.now = datetime.now(timezone.utc)
-        
-        # Initialize other modules
-        self.knowledge_assessor = KnowledgeAssessor(db, user_id)
-        self.override_tracker = OverrideTracker(db, user_id)
+    def __init__(self, history: TrainingHistory):
+        self.history = history
+        self.user_id = history.user_id
+        self.now = history.now
+        
+        # Initialize other modules (sharing the same history snapshot)
+        self.knowledge_assessor = KnowledgeAssessor(history)
+        self.override_tracker = OverrideTracker(history)
     
+    @cached_analytics("strength_projections")
     def get_strength_projections(self, days_back: int = 90) -> Dict[str, Any]:
         """
         Get strength projections for all exercises
@@ -179,41 +182,27 @@ class ProgressProjector:
         """Get strength exercise history with weights"""
         cutoff = self.now - timedelta(days=days_back)
         
-        workouts = self.db.query(Workout).filter(
-            Workout.user_id == self.user_id,
-            Workout.end_time.isnot(None),
-            Workout.start_time >= cutoff,
-            Workout.start_time.isnot(None)
-        ).order_by(Workout.start_time.asc()).all()
-        
         exercise_history = {}
         
-        for workout in workouts:
-            for w_ex in workout.exercises:
-                if w_ex.exercise and w_ex.weight_kg and w_ex.exercise.exercise_type == "strength":
-                    ex_id = w_ex.exercise_id
-                    
-                    if ex_id not in exercise_history:
-                        exercise_history[ex_id] = {
-                            "exercise_name": w_ex.exercise.name,
-                            "muscle_group": w_ex.exercise.muscle_group,
-                            "history": []
-                        }
-                    
-                    # Calculate estimated 1RM using Epley formula
-                    reps = w_ex.reps or 1
-                    weight = w_ex.weight_kg
-                    estimated_1rm = weight * (1 + reps / 30)  # Simplified Epley
-                    
-                    exercise_history[ex_id]["history"].append({
-                        "date": workout.start_time.date().isoformat(),
-                        "workout_id": workout.id,
-                        "weight_kg": weight,
-                        "reps": reps,
-                        "sets": w_ex.sets or 0,
-                        "estimated_1rm": round(estimated_1rm, 1),
-                        "actual_1rm": weight if reps == 1 else None
-                    })
+        # Each day's best-e1RM set (weight and reps of that one set), precomputed in exercise_progress
+        for row in self.history.exercise_progress(cutoff):
+            ex_id = row.exercise_id
+            
+            if ex_id not in exercise_history:
+                exercise_history[ex_id] = {
+                    "exercise_name": row.name,
+                    "muscle_group": row.muscle_group,
+                    "history": []
+                }
+            
+            exercise_history[ex_id]["history"].append({
+                "date": row.date.isoformat(),
+                "weight_kg": row.best_weight,
+                "reps": row.reps,
+                "sets": row.sets,
+                "estimated_1rm": round(row.best_e1rm, 1),
+                "actual_1rm": row.best_weight if row.reps == 1 else None
+            })
         
         return exercise_history
     
@@ -474,24 +463,14 @@ class ProgressProjector:
         """
         cutoff = self.now - timedelta(days=days_back)
         
-        # Get actual workouts
-        workouts = self.db.query(Workout).filter(
-            Workout.user_id == self.user_id,
-            Workout.end_time.isnot(None),
-            Workout.start_time >= cutoff,
-            Workout.start_time.isnot(None)
-        ).order_by(Workout.start_time.asc()).all()
+        # Actual training days from the user's calendar bitset
+        calendar = self.history.calendar()
+        today = self.now.date()
+        actual_workouts = calendar.count(cutoff.date(), today)
         
-        if not workouts:
+        if not actual_workouts:
             return {"message": "No workout data available"}
         
-        # Calculate actual consistency
-        workout_dates = set()
-        for workout in workouts:
-            if workout.start_time:
-                workout_dates.add(workout.start_time.date())
-        
-        actual_workouts = len(workout_dates)
         actual_consistency_rate = (actual_workouts / days_back) * 7  # workouts/week
         
         # Get knowledge level for projected target
@@ -500,7 +479,7 @@ class ProgressProjector:
         projected_workouts = int((projected_rate / 7) * days_back)
         
         # Calculate streaks
-        best_streak, current_streak = self._calculate_streaks(list(workout_dates))
+        best_streak, current_streak = calendar.streaks(cutoff.date(), today)
         projected_streak = int(best_streak * 1.5)  # Optimistic projection
         
         consistency_gap = max(0, projected_rate - actual_consistency_rate) / projected_rate
@@ -542,51 +521,6 @@ class ProgressProjector:
             "consistency_messages": self._generate_consistency_messages(projection, level)
         }
     
-    def _calculate_streaks(self, workout_dates: List[datetime.date]) -> Tuple[int, int]:
-        """Calculate best and current streaks"""
-        if not workout_dates:
-            return 0, 0
-        
-        # Sort dates
-        dates = sorted(workout_dates)
-        
-        # Calculate streaks
-        best_streak = 1
-        current_streak = 1
-        temp_streak = 1
-        
-        for i in range(1, len(dates)):
-            days_diff = (dates[i] - dates[i-1]).days
-            
-            if days_diff == 1:  # Consecutive days
-                temp_streak += 1
-                best_streak = max(best_streak, temp_streak)
-            elif days_diff <= 3:  # Allow small gaps for "streak"
-                temp_streak += 1  # Count as streak with rest days
-                best_streak = max(best_streak, temp_streak)
-            else:
-                temp_streak = 1
-        
-        # Calculate current streak (from most recent date)
-        today = self.now.date()
-        current_streak = 0
-        
-        for i in range(len(dates)-1, -1, -1):
-            if i == len(dates)-1:
-                # Check if last workout was recent
-                if (today - dates[i]).days <= 3:
-                    current_streak = 1
-                else:
-                    break
-            else:
-                days_diff = (dates[i+1] - dates[i]).days
-                if days_diff <= 3:
-                    current_streak += 1
-                else:
-                    break
-        
-        return best_streak, current_streak
-    
     def _generate_consistency_messages(self, 
                                      projection: ConsistencyProjection,
                                      level: KnowledgeLevel) -> List[str]:
@@ -694,7 +628,11 @@ class ProgressProjector:
         }
     
     def _get_motivational_quote(self, score: float) -> str:
-        """Get motivational quote based on score"""
+        """
+        Get motivational quote based on score. The pick rotates with the
+        history version (not random) so the report is stable - and cacheable -
+        until the user trains again.
+        """
         quotes = {
             "high": [
                 "The only bad workout is the one that didn't happen.",
@@ -713,13 +651,16 @@ class ProgressProjector:
             ]
         }
         
-        import random
         if score > 70:
-            return random.choice(quotes["high"])
+            options = quotes["high"]
         elif score > 40:
-            return random.choice(quotes["medium"])
+            options = quotes["medium"]
         else:
-            return random.choice(quotes["low"])
+            options = quotes["low"]
+        
+        user = self.history.user
+        version = (user.history_version or 0) if user is not None else 0
+        return options[(self.user_id + version) % len(options)]
     
     def _generate_actionable_insights(self, 
                                     strength: Dict, 
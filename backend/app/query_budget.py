@@ -0,0 +1,108 @@
+"""
+🔍 Per-Request Query Budget (development / test mode)
+With QUERY_DEBUG on, cursor events count and time every statement a
+request runs, flag N+1 patterns (the same statement repeated with
+different parameters) and attach the numbers as response headers:
+
+    X-Query-Count, X-Query-Time-Ms, X-Query-N-Plus-One, X-Query-Budget
+
+Routes declare a ceiling with dependencies=[Depends(query_budget(8))];
+with QUERY_BUDGET_ENFORCE on, exceeding it turns the response into a 500.
+"""
+
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.config import settings
+
+class RequestQueries:
+    """Statements executed while handling one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.budget: Optional[int] = None
+        self._params: Dict[str, set] = defaultdict(set)
+        self._executions: Dict[str, int] = defaultdict(int)
+
+    def record(self, statement: str, parameters, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self._executions[statement] += 1
+        self._params[statement].add(repr(parameters))
+
+    def n_plus_one(self) -> List[Tuple[str, int]]:
+        """(statement, executions) repeated past the threshold with differing parameters"""
+        return [
+            (statement, executions)
+            for statement, executions in self._executions.items()
+            if executions >= settings.QUERY_REPEAT_THRESHOLD and len(self._params[statement]) > 1
+        ]
+
+_current: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+def current_queries() -> Optional[RequestQueries]:
+    """Query stats of the request being handled (None outside debug mode)"""
+    return _current.get()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start"].pop()
+    queries = _current.get()
+    if queries is not None:
+        queries.record(statement, parameters, (time.perf_counter() - started) * 1000)
+
+def track_queries(target=Engine) -> None:
+    """
+    Feed statements into the current request's stats. Listening on the
+    Engine class covers the primary, replica and (lazily built) async engines.
+    """
+    if not event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        event.listen(target, "before_cursor_execute", _before_cursor_execute)
+        event.listen(target, "after_cursor_execute", _after_cursor_execute)
+
+def query_budget(max_queries: int):
+    """Route dependency declaring how many statements the endpoint may run"""
+    def declare_budget():
+        queries = _current.get()
+        if queries is not None:
+            queries.budget = max_queries
+    return declare_budget
+
+def install_query_debug(app: FastAPI) -> None:
+    """Count queries per request and report them on the response"""
+    track_queries()
+
+    @app.middleware("http")
+    async def count_queries(request: Request, call_next):
+        queries = RequestQueries()
+        token = _current.set(queries)
+        try:
+            response = await call_next(request)
+        finally:
+            _current.reset(token)
+
+        route = f"{request.method} {request.url.path}"
+        suspects = queries.n_plus_one()
+        for statement, executions in suspects:
+            print(f"⚠️ Possible N+1 on {route}: {executions}x {' '.join(statement.split())[:160]}")
+
+        if queries.budget is not None and queries.count > queries.budget:
+            message = f"Query budget exceeded on {route}: {queries.count} > {queries.budget}"
+            print(f"⚠️ {message}")
+            if settings.QUERY_BUDGET_ENFORCE:
+                response = JSONResponse(status_code=500, content={"detail": message})
+
+        response.headers["X-Query-Count"] = str(queries.count)
+        response.headers["X-Query-Time-Ms"] = f"{queries.total_ms:.1f}"
+        response.headers["X-Query-N-Plus-One"] = str(len(suspects))
+        if queries.budget is not None:
+            response.headers["X-Query-Budget"] = str(queries.budget)
+        return response
@@ -4,12 +4,16 @@ Mental Model: "Given what you've done recently, what is the most responsible thi
 """
 
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 from collections import defaultdict
 import sqlalchemy
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, func
-from app.models import Workout, WorkoutExercise, Exercise, User
+from app.models import Workout, WorkoutExercise, User
+from app.training_history import TrainingHistory
+from app.history_queries import WorkoutRow
+from app.analytics_cache import cached_analytics
+from app.exercise_catalog import CatalogExercise, exercise_catalog
 
 class RecoveryPreference:
     """Recovery preference mapping"""
@@ -53,25 +57,20 @@ class MuscleTracker:
 class WorkoutAnalyzer:
     """Analyzes user's workout history"""
     
-    def __init__(self, db: Session, user_id: int, days_back: int = 7):
-        self.db = db
-        self.user_id = user_id
+    def __init__(self, history: TrainingHistory, days_back: int = 7):
+        self.history = history
+        self.user_id = history.user_id
         self.days_back = days_back
         self.cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_back)
     
-    def get_recent_workouts(self) -> List[Workout]:
-        """Get workouts from last N days"""
-        return self.db.query(Workout).filter(
-            Workout.user_id == self.user_id,
-            Workout.start_time >= self.cutoff_date,
-            Workout.end_time.isnot(None)  # Only completed workouts
-        ).order_by(Workout.start_time.desc()).all()
+    def get_recent_workouts(self) -> List[WorkoutRow]:
+        """Get completed workouts from last N days, newest first"""
+        return list(reversed(self.history.workouts_since(self.cutoff_date)))
     
     def analyze_muscle_fatigue(self) -> Dict[str, Dict]:
         """
         Analyze muscle fatigue and recovery status
         """
-        workouts = self.get_recent_workouts()
         muscle_data = {}
         now = datetime.now(timezone.utc)
         
@@ -85,44 +84,17 @@ class WorkoutAnalyzer:
                 "priority_score": 0.0
             }
         
-        # Process each workout
-        for workout in workouts:
-            # Get workout time (prefer end_time, fallback to start_time)
-            workout_time = workout.end_time or workout.start_time
-            
-            if workout_time:
-                # Ensure workout_time is timezone-aware
-                if workout_time.tzinfo is None:
-                    # Assume UTC if no timezone info
-                    workout_time = workout_time.replace(tzinfo=timezone.utc)
-                else:
-                    # Convert to UTC if it has timezone
-                    workout_time = workout_time.astimezone(timezone.utc)
-            
-            for workout_ex in workout.exercises:
-                exercise = workout_ex.exercise
-                if exercise and exercise.muscle_group:
-                    muscle_group = MuscleTracker.classify_muscle_group(exercise.muscle_group)
-                    
-                    if muscle_group in muscle_data:
-                        data = muscle_data[muscle_group]
-                        data["session_count"] += 1
-                        
-                        # Update last trained time
-                        if workout_time:
-                            # Ensure we have a datetime for comparison
-                            if data["last_trained"] is None:
-                                data["last_trained"] = workout_time
-                                # Calculate hours since
-                                hours_since = (now - workout_time).total_seconds() / 3600
-                                data["hours_since_last"] = max(0, hours_since)  # Never negative
-                            else:
-                                # Check if this workout is more recent
-                                if workout_time > data["last_trained"]:
-                                    data["last_trained"] = workout_time
-                                    # Recalculate hours since
-                                    hours_since = (now - workout_time).total_seconds() / 3600
-                                    data["hours_since_last"] = max(0, hours_since)
+        # Per-muscle counts and last completion time come from one GROUP BY
+        for activity in self.history.muscle_activity(self.cutoff_date):
+            if activity.muscle_category in muscle_data:
+                data = muscle_data[activity.muscle_category]
+                data["session_count"] = activity.entry_count
+                
+                if activity.last_trained:
+                    data["last_trained"] = activity.last_trained
+                    # Calculate hours since
+                    hours_since = (now - activity.last_trained).total_seconds() / 3600
+                    data["hours_since_last"] = max(0, hours_since)  # Never negative
         
         # Calculate scores
         for muscle_group, data in muscle_data.items():
@@ -184,30 +156,26 @@ class WorkoutAnalyzer:
 class ExerciseRecommender:
     """Generates exercise recommendations"""
     
-    def __init__(self, db: Session, user_id: int):
-        self.db = db
-        self.user_id = user_id
-        self.analyzer = WorkoutAnalyzer(db, user_id)
+    def __init__(self, history: TrainingHistory):
+        self.history = history
+        self.db = history.db
+        self.user_id = history.user_id
+        self.analyzer = WorkoutAnalyzer(history)
     
-    def get_available_exercises(self, muscle_group: Optional[str] = None) -> List[Exercise]:
-        """Get exercises filtered by muscle group"""
-        query = self.db.query(Exercise).filter(Exercise.is_active == True)
-        
+    def get_available_exercises(self,
+                                muscle_group: Optional[str] = None,
+                                exercise_type: Optional[str] = None) -> Sequence[CatalogExercise]:
+        """
+        Active exercises, optionally for one muscle group and exercise type.
+        Served from the catalog's muscle index - O(group size), no query.
+        """
         if muscle_group:
-            # Find exercises that match the muscle group
-            matching_exercises = []
-            all_exercises = query.all()
-            
-            for exercise in all_exercises:
-                if exercise.muscle_group:
-                    classified = MuscleTracker.classify_muscle_group(exercise.muscle_group)
-                    if classified == muscle_group:
-                        matching_exercises.append(exercise)
-            
-            return matching_exercises
-        
-        return query.all()
+            return exercise_catalog.by_muscle(self.db, muscle_group, exercise_type)
+        if exercise_type:
+            return exercise_catalog.by_type(self.db, exercise_type)
+        return exercise_catalog.all(self.db)
     
+    @cached_analytics("recommendation")
     def generate_recommendation(self, 
                                recovery_preference: str = "moderate",
                                max_recommendations: int = 4) -> Dict:
@@ -216,7 +184,7 @@ class ExerciseRecommender:
         Returns structure matching RecommendationResponse schema
         """
         # Get user info
-        user = self.db.query(User).filter(User.id == self.user_id).first()
+        user = self.history.user
         
         # Analyze muscle state
         muscle_data = self.analyzer.analyze_muscle_fatigue()
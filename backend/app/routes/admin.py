@@ -5,6 +5,7 @@ from app.schemas import AdminCreateUser, AdminResetPassword
 from app.models import User
 from app.auth import hash_password
 from app.dependencies import admin_required
+from app.auth_cache import auth_user_cache
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
@@ -25,4 +26,5 @@ def reset_password(data: AdminResetPassword, db: Session = Depends(get_db), _=De
     user = db.query(User).filter(User.id == data.user_id).first()
     user.hashed_password = hash_password(data.new_password)
     db.commit()
+    auth_user_cache.invalidate(user.id)
     return {"status": "password_reset"}
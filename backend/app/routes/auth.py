@@ -4,6 +4,8 @@ from app.database import get_db
 from app.models import User
 from app.schemas import LoginRequest, TokenResponse
 from app.auth import verify_password, create_access_token, create_refresh_token
+from app.auth_cache import AuthUser
+from app.config import settings
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
@@ -13,7 +15,8 @@ def login(data: LoginRequest, db: Session = Depends(get_db)):
     if not user or not verify_password(data.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    claims = AuthUser.from_row(user).to_claims() if settings.AUTH_TOKEN_CLAIMS else None
     return {
-        "access_token": create_access_token(user.id),
+        "access_token": create_access_token(user.id, claims),
         "refresh_token": create_refresh_token(user.id)
     }
@@ -1,28 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List
 from app.database import get_db
 from app.schemas import ExerciseCreate, ExerciseResponse
 from app.models import Exercise
 from app.dependencies import admin_required
+from app.recommendation import MuscleTracker
+from app.exercise_catalog import exercise_catalog
+from app.analytics_cache import analytics_cache
+from app.http_cache import catalog_etag
 
 router = APIRouter(prefix="/api/exercises", tags=["exercises"])
 
-@router.get("/", response_model=List[ExerciseResponse])
+def _catalog_changed():
+    """Reload the catalog on next use; cached recommendations name exercises, so drop them too"""
+    exercise_catalog.bump()
+    analytics_cache.clear()
+
+@router.get("/", response_model=List[ExerciseResponse], dependencies=[Depends(catalog_etag)])
 def get_exercises(
-    skip: int = 0,
-    limit: int = 100,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
     db: Session = Depends(get_db)
 ):
-    exercises = db.query(Exercise).filter(Exercise.is_active == True).offset(skip).limit(limit).all()
-    return exercises
+    return exercise_catalog.all(db)[skip:skip + limit]
 
-@router.get("/{exercise_id}", response_model=ExerciseResponse)
+@router.get("/{exercise_id}", response_model=ExerciseResponse, dependencies=[Depends(catalog_etag)])
 def get_exercise(
     exercise_id: int,
     db: Session = Depends(get_db)
 ):
-    exercise = db.query(Exercise).filter(Exercise.id == exercise_id, Exercise.is_active == True).first()
+    exercise = exercise_catalog.get(db, exercise_id)
     if not exercise:
         raise HTTPException(status_code=404, detail="Exercise not found")
     return exercise
@@ -43,6 +51,7 @@ def create_exercise(
         description=exercise.description,
         exercise_type=exercise.exercise_type,
         muscle_group=exercise.muscle_group,
+        muscle_category=MuscleTracker.classify_muscle_group(exercise.muscle_group),
         equipment_required=exercise.equipment_required,
         created_by_admin_id=admin_user.id
     )
@@ -50,6 +59,7 @@ def create_exercise(
     db.add(db_exercise)
     db.commit()
     db.refresh(db_exercise)
+    _catalog_changed()
     return db_exercise
 
 @router.delete("/{exercise_id}")
@@ -64,4 +74,5 @@ def delete_exercise(
     
     exercise.is_active = False
     db.commit()
+    _catalog_changed()
     return {"status": "exercise_deleted"}
@@ -4,25 +4,26 @@ Knowledge Level + Override Tracking
 """
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.dependencies import get_current_user
-from app.models import User
+from app.dependencies import get_current_user, get_training_history
+from app.auth_cache import AuthUser
+from app.training_history import TrainingHistory
 from app.knowledge_level import KnowledgeAssessor
 from app.override_tracking import OverrideTracker
 from app.recommendation import ExerciseRecommender
+from app.query_budget import query_budget
+from app.http_cache import history_etag
 
 router = APIRouter(prefix="/api/intelligence", tags=["intelligence"])
 
-@router.get("/knowledge-level")
+@router.get("/knowledge-level", dependencies=[Depends(query_budget(6)), Depends(history_etag)])
 def get_knowledge_level(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    history: TrainingHistory = Depends(get_training_history),
+    current_user: AuthUser = Depends(get_current_user)
 ):
     """
     Get user's fitness knowledge level assessment
     """
-    assessor = KnowledgeAssessor(db, current_user.id)
+    assessor = KnowledgeAssessor(history)
     level, assessment = assessor.assess_knowledge_level()
     
     return {
@@ -36,13 +37,13 @@ def get_knowledge_level(
 @router.post("/safety-check")
 def safety_check_workout(
     planned_workout: dict,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    history: TrainingHistory = Depends(get_training_history),
+    current_user: AuthUser = Depends(get_current_user)
 ):
     """
     Check planned workout for safety issues based on knowledge level
     """
-    assessor = KnowledgeAssessor(db, current_user.id)
+    assessor = KnowledgeAssessor(history)
     warnings = assessor.generate_safety_warnings(planned_workout)
     
     # Also get knowledge level context
@@ -58,16 +59,16 @@ def safety_check_workout(
         "recommendations": assessor.get_level_based_recommendations() if warnings else None
     }
 
-@router.get("/override-analysis")
+@router.get("/override-analysis", dependencies=[Depends(query_budget(5)), Depends(history_etag)])
 def get_override_analysis(
     days_back: int = 90,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    history: TrainingHistory = Depends(get_training_history),
+    current_user: AuthUser = Depends(get_current_user)
 ):
     """
     Analyze user's override patterns and biases
     """
-    tracker = OverrideTracker(db, current_user.id)
+    tracker = OverrideTracker(history)
     analysis = tracker.analyze_override_patterns(days_back)
     
     return {
@@ -76,16 +77,16 @@ def get_override_analysis(
         "override_analysis": analysis
     }
 
-@router.get("/override-report")
+@router.get("/override-report", dependencies=[Depends(query_budget(5)), Depends(history_etag)])
 def get_override_report(
     days_back: int = 90,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    history: TrainingHistory = Depends(get_training_history),
+    current_user: AuthUser = Depends(get_current_user)
 ):
     """
     Get comprehensive override report with recommendations
     """
-    tracker = OverrideTracker(db, current_user.id)
+    tracker = OverrideTracker(history)
     report = tracker.generate_override_report(days_back)
     
     return {
@@ -93,26 +94,26 @@ def get_override_report(
         "report": report
     }
 
-@router.get("/smart-recommendations")
+@router.get("/smart-recommendations", dependencies=[Depends(query_budget(12)), Depends(history_etag)])
 def get_smart_recommendations(
     recovery_preference: str = "moderate",
     days_back: int = 7,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    history: TrainingHistory = Depends(get_training_history),
+    current_user: AuthUser = Depends(get_current_user)
 ):
     """
     Get recommendations enhanced with knowledge level and override analysis
     """
     # Get base recommendations
-    recommender = ExerciseRecommender(db, current_user.id)
+    recommender = ExerciseRecommender(history)
     base_result = recommender.generate_recommendation(recovery_preference)
     
     # Get knowledge level context
-    assessor = KnowledgeAssessor(db, current_user.id)
+    assessor = KnowledgeAssessor(history)
     level, assessment = assessor.assess_knowledge_level()
     
-    # Get override adjustments
-    tracker = OverrideTracker(db, 30)  # 30 days for override analysis
+    # Get override adjustments (30 days for override analysis)
+    tracker = OverrideTracker(history)
     base_recs = []
     if base_result.get("algorithm_choice"):
         base_recs.append(base_result["algorithm_choice"])
@@ -133,24 +134,24 @@ def get_smart_recommendations(
     
     return enhanced_result
 
-@router.get("/training-insights")
+@router.get("/training-insights", dependencies=[Depends(query_budget(10)), Depends(history_etag)])
 def get_training_insights(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    history: TrainingHistory = Depends(get_training_history),
+    current_user: AuthUser = Depends(get_current_user)
 ):
     """
     Get comprehensive training insights combining all intelligence modules
     """
     # Knowledge level
-    assessor = KnowledgeAssessor(db, current_user.id)
+    assessor = KnowledgeAssessor(history)
     level, level_assessment = assessor.assess_knowledge_level()
     
     # Override analysis
-    tracker = OverrideTracker(db, current_user.id)
+    tracker = OverrideTracker(history)
     override_analysis = tracker.analyze_override_patterns(90)
     
     # Recommendations
-    recommender = ExerciseRecommender(db, current_user.id)
+    recommender = ExerciseRecommender(history)
     recommendations = recommender.generate_recommendation()
     
     # Generate insights
@@ -5,27 +5,27 @@ from datetime import datetime, timedelta
 import random
 import math
 
-from app.database import get_db
-from app.dependencies import get_current_user
+from app.http_cache import history_etag
+from app.dependencies import get_current_user, get_async_training_history
 from app.progress_projections import ProgressProjector
+from app.training_history import AsyncTrainingHistory
 
 # ADD THE PREFIX HERE
 router = APIRouter(prefix="/api/progress", tags=["progress"])
 
-@router.get("/strength-projections")
+@router.get("/strength-projections", dependencies=[Depends(history_etag)])
 async def get_strength_projections(
     days_back: int = 30,
-    db: Session = Depends(get_db),
+    history: AsyncTrainingHistory = Depends(get_async_training_history),
     current_user: Dict = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """Calculate what strength gains COULD have been achieved"""
     try:
-        projector = ProgressProjector(db, current_user["id"])
-        return projector.get_strength_projections(days_back)
+        return await history.run(lambda h: ProgressProjector(h).get_strength_projections(days_back))
     except Exception as e:
         print(f"Error in strength projections: {e}")
         return {
-            "user_id": current_user["id"],
+            "user_id": current_user.id,
             "projections": {
                 "knowledge_level": "novice",
                 "base_progression_rate_kg_week": 0.0,
@@ -49,20 +49,19 @@ async def get_strength_projections(
             "note": "Complete more workouts for accurate projections"
         }
 
-@router.get("/consistency-projections")
+@router.get("/consistency-projections", dependencies=[Depends(history_etag)])
 async def get_consistency_projections(
     days_back: int = 30,
-    db: Session = Depends(get_db),
+    history: AsyncTrainingHistory = Depends(get_async_training_history),
     current_user: Dict = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """Calculate consistency metrics and projections"""
     try:
-        projector = ProgressProjector(db, current_user["id"])
-        return projector.get_consistency_projections(days_back)
+        return await history.run(lambda h: ProgressProjector(h).get_consistency_projections(days_back))
     except Exception as e:
         print(f"Error in consistency projections: {e}")
         return {
-            "user_id": current_user["id"],
+            "user_id": current_user.id,
             "projections": {
                 "current_consistency": "low",
                 "projected_consistency": "medium",
@@ -75,20 +74,19 @@ async def get_consistency_projections(
             "data_quality": "low"
         }
 
-@router.get("/comprehensive-report")
+@router.get("/comprehensive-report", dependencies=[Depends(history_etag)])
 async def get_comprehensive_report(
     days_back: int = 90,
-    db: Session = Depends(get_db),
+    history: AsyncTrainingHistory = Depends(get_async_training_history),
     current_user: Dict = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """Get a comprehensive progress report"""
     try:
-        projector = ProgressProjector(db, current_user["id"])
-        return projector.get_comprehensive_report(days_back)
+        return await history.run(lambda h: ProgressProjector(h).get_comprehensive_report(days_back))
     except Exception as e:
         print(f"Error in comprehensive report: {e}")
         return {
-            "user_id": current_user["id"],
+            "user_id": current_user.id,
             "report": {
                 "summary": "Limited data available",
                 "strength_progress": "insufficient_data",
@@ -98,20 +96,19 @@ async def get_comprehensive_report(
             "data_quality": "low"
         }
 
-@router.get("/motivational-insights")
+@router.get("/motivational-insights", dependencies=[Depends(history_etag)])
 async def get_motivational_insights(
     days_back: int = 30,
-    db: Session = Depends(get_db),
+    history: AsyncTrainingHistory = Depends(get_async_training_history),
     current_user: Dict = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """Get motivational insights based on progress"""
     try:
-        projector = ProgressProjector(db, current_user["id"])
-        return projector.get_motivational_insights(days_back)
+        return await history.run(lambda h: ProgressProjector(h).get_motivational_insights(days_back))
     except Exception as e:
         print(f"Error in motivational insights: {e}")
         return {
-            "user_id": current_user["id"],
+            "user_id": current_user.id,
             "insights": [
                 "Every journey starts with a single step",
                 "Consistency is more important than intensity"
@@ -119,20 +116,19 @@ async def get_motivational_insights(
             "quote": "The best time to start was yesterday. The second best time is now."
         }
 
-@router.get("/missed-opportunities")
+@router.get("/missed-opportunities", dependencies=[Depends(history_etag)])
 async def get_missed_opportunities(
     days_back: int = 30,
-    db: Session = Depends(get_db),
+    history: AsyncTrainingHistory = Depends(get_async_training_history),
     current_user: Dict = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """Analyze missed workout opportunities"""
     try:
-        projector = ProgressProjector(db, current_user["id"])
-        return projector.get_missed_opportunities(days_back)
+        return await history.run(lambda h: ProgressProjector(h).get_missed_opportunities(days_back))
     except Exception as e:
         print(f"Error in missed opportunities: {e}")
         return {
-            "user_id": current_user["id"],
+            "user_id": current_user.id,
             "missed_opportunities": [],
             "total_potential_gain": "0%",
             "recommendation": "Start tracking workouts to see potential gains"
@@ -1,19 +1,22 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any
 from datetime import datetime, timedelta
 import random
 
-from app.database import get_db
-from app.dependencies import get_current_user
+from app.database import get_async_read_db
+from app.dependencies import get_current_user, get_current_user_row
+from app.http_cache import history_etag
 from app.models import Workout
+from app.history_queries import count_training_days
 
 router = APIRouter()
 
-@router.get("/strength-projections-simple")
+@router.get("/strength-projections-simple", dependencies=[Depends(history_etag)])
 async def get_strength_projections_simple(
     days_back: int = 30,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: Dict = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """Simple strength projections without complex dependencies"""
@@ -22,11 +25,13 @@ async def get_strength_projections_simple(
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days_back)
         
-        workout_count = db.query(Workout).filter(
-            Workout.user_id == current_user["id"],
-            Workout.start_time >= start_date,
-            Workout.start_time <= end_date
-        ).count()
+        workout_count = await db.scalar(
+            select(func.count(Workout.id)).where(
+                Workout.user_id == current_user.id,
+                Workout.start_time >= start_date,
+                Workout.start_time <= end_date
+            )
+        )
         
         # Simple projection logic
         if workout_count == 0:
@@ -43,7 +48,7 @@ async def get_strength_projections_simple(
             message = f"Good consistency! {workout_count} workouts completed."
         
         return {
-            "user_id": current_user["id"],
+            "user_id": current_user.id,
             "projections": {
                 "knowledge_level": knowledge_level,
                 "base_progression_rate_kg_week": 1.0,
@@ -70,7 +75,7 @@ async def get_strength_projections_simple(
         
     except Exception as e:
         return {
-            "user_id": current_user["id"],
+            "user_id": current_user.id,
             "error": str(e),
             "projections": {
                 "knowledge_level": "novice",
@@ -83,28 +88,25 @@ async def get_strength_projections_simple(
             }
         }
 
-@router.get("/consistency-projections-simple")
+@router.get("/consistency-projections-simple", dependencies=[Depends(history_etag)])
 async def get_consistency_projections_simple(
     days_back: int = 30,
-    db: Session = Depends(get_db),
-    current_user: Dict = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Dict = Depends(get_current_user_row)
 ) -> Dict[str, Any]:
     """Simple consistency projections"""
     try:
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days_back)
         
-        workouts = db.query(Workout).filter(
-            Workout.user_id == current_user["id"],
-            Workout.start_time >= start_date,
-            Workout.start_time <= end_date
-        ).all()
-        
-        actual = len(workouts)
+        # Distinct training days, counted in SQL
+        actual = await db.run_sync(
+            count_training_days, current_user.id, start_date, current_user.archived_before
+        )
         projected = int((days_back / 7) * 3)  # 3 workouts/week target
         
         return {
-            "user_id": current_user["id"],
+            "user_id": current_user.id,
             "projections": {
                 "actual_workouts": actual,
                 "projected_workouts": projected,
@@ -119,7 +121,7 @@ async def get_consistency_projections_simple(
         
     except Exception as e:
         return {
-            "user_id": current_user["id"],
+            "user_id": current_user.id,
             "error": str(e),
             "projections": {
                 "actual_workouts": 0,
@@ -1,15 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any
-from app.database import get_db
-from app.dependencies import get_current_user
+from datetime import datetime, timedelta, timezone
+from app.database import get_async_read_db
+from app.http_cache import history_etag
+from app.dependencies import get_current_user, get_user_state
+from app.history_queries import count_training_days
+from app.user_state import UserState
 
 router = APIRouter(prefix="/api/progress", tags=["progress"])
 
-@router.get("/strength-projections")
+@router.get("/strength-projections", dependencies=[Depends(history_etag)])
 async def get_strength_projections(
     days_back: int = 30,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: Dict = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """Simple working version"""
@@ -46,21 +50,27 @@ async def get_strength_projections(
             }
         }
 
-@router.get("/consistency-projections")
+@router.get("/consistency-projections", dependencies=[Depends(history_etag)])
 async def get_consistency_projections(
     days_back: int = 30,
-    db: Session = Depends(get_db),
-    current_user: Dict = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserState = Depends(get_user_state)
 ) -> Dict[str, Any]:
     """Simple consistency projections"""
-    user_id = current_user.id if hasattr(current_user, 'id') else current_user.get('id', 1)
+    since = datetime.now(timezone.utc) - timedelta(days=days_back)
+    # Distinct training days, counted in SQL (one aggregate query)
+    training_days = await db.run_sync(
+        count_training_days, current_user.id, since, current_user.archived_before
+    )
+    target = int((days_back / 7) * 3)  # 3 workouts/week target
     return {
-        "user_id": user_id,
+        "user_id": current_user.id,
         "days_analyzed": days_back,
         "projections": {
-            "current_consistency_score": 75,
+            "training_days": training_days,
+            "current_consistency_score": min(100, round(training_days / target * 100)) if target > 0 else 0,
             "projected_90_day_score": 85,
-            "missed_workouts": 3,
+            "missed_workouts": max(0, target - training_days),
             "potential_gains": {
                 "strength": "15-20%",
                 "endurance": "20-25%",
@@ -69,10 +79,10 @@ async def get_consistency_projections(
         }
     }
 
-@router.get("/comprehensive-report")
+@router.get("/comprehensive-report", dependencies=[Depends(history_etag)])
 async def get_comprehensive_report(
     days_back: int = 90,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: Dict = Depends(get_current_user)
 ):
     user_id = current_user.id if hasattr(current_user, 'id') else current_user.get('id', 1)
@@ -86,10 +96,10 @@ async def get_comprehensive_report(
         }
     }
 
-@router.get("/motivational-insights")
+@router.get("/motivational-insights", dependencies=[Depends(history_etag)])
 async def get_motivational_insights(
     days_back: int = 30,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: Dict = Depends(get_current_user)
 ):
     user_id = current_user.id if hasattr(current_user, 'id') else current_user.get('id', 1)
@@ -103,10 +113,10 @@ async def get_motivational_insights(
         "phase_d": "emotional_training_partner_active"
     }
 
-@router.get("/missed-opportunities")
+@router.get("/missed-opportunities", dependencies=[Depends(history_etag)])
 async def get_missed_opportunities(
     days_back: int = 30,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: Dict = Depends(get_current_user)
 ):
     user_id = current_user.id if hasattr(current_user, 'id') else current_user.get('id', 1)
@@ -3,11 +3,12 @@
 """
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.dependencies import get_current_user
-from app.models import User
+from app.dependencies import get_current_user, get_training_history
+from app.auth_cache import AuthUser
+from app.training_history import TrainingHistory
 from app.recommendation import ExerciseRecommender, WorkoutAnalyzer
+from app.query_budget import query_budget
+from app.http_cache import history_etag
 from app.schemas_recommendation import (
     RecommendationRequest,
     RecommendationResponse,
@@ -17,16 +18,16 @@ from app.schemas_recommendation import (
 
 router = APIRouter(prefix="/api/recommendations", tags=["recommendations"])
 
-@router.get("/muscle-analysis", response_model=MuscleAnalysisResponse)
+@router.get("/muscle-analysis", response_model=MuscleAnalysisResponse, dependencies=[Depends(query_budget(4)), Depends(history_etag)])
 def get_muscle_analysis(
     days_back: int = 7,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    history: TrainingHistory = Depends(get_training_history),
+    current_user: AuthUser = Depends(get_current_user)
 ):
     """
     Get detailed muscle group analysis
     """
-    analyzer = WorkoutAnalyzer(db, current_user.id, days_back)
+    analyzer = WorkoutAnalyzer(history, days_back)
     muscle_data = analyzer.analyze_muscle_fatigue()
     neglected = analyzer.get_neglected_muscles(days_back)
     recovery_status = analyzer.get_recovery_status("moderate")
@@ -61,14 +62,14 @@ def get_muscle_analysis(
 @router.post("/generate", response_model=RecommendationResponse)
 def generate_recommendation(
     request: RecommendationRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    history: TrainingHistory = Depends(get_training_history),
+    current_user: AuthUser = Depends(get_current_user)
 ):
     """
     Generate workout recommendations based on training history
     """
     try:
-        recommender = ExerciseRecommender(db, current_user.id)
+        recommender = ExerciseRecommender(history)
         result = recommender.generate_recommendation(
             recovery_preference=request.recovery_preference,
             max_recommendations=4
@@ -93,15 +94,15 @@ def generate_recommendation(
             detail=f"Recommendation generation failed: {str(e)}"
         )
 
-@router.get("/quick")
+@router.get("/quick", dependencies=[Depends(query_budget(5)), Depends(history_etag)])
 def quick_recommendation(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    history: TrainingHistory = Depends(get_training_history),
+    current_user: AuthUser = Depends(get_current_user)
 ):
     """
     Quick recommendation (default settings)
     """
-    recommender = ExerciseRecommender(db, current_user.id)
+    recommender = ExerciseRecommender(history)
     result = recommender.generate_recommendation()
     
     # Simplified response for quick view
@@ -1,7 +1,20 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from app.db_pool import get_pool_stats
+from app.analytics_cache import analytics_cache
+from app.dependencies import admin_required
 
 router = APIRouter(prefix="/api/system", tags=["system"])
 
 @router.get("/health")
 def health():
     return {"status": "ok"}
+
+@router.get("/db-pool")
+def db_pool(_=Depends(admin_required)):
+    """Connection pool counters per engine (primary, replica, async, async_replica)"""
+    return get_pool_stats()
+
+@router.get("/analytics-cache")
+def analytics_cache_stats(_=Depends(admin_required)):
+    """Analytics result cache size and hit rate for this worker"""
+    return analytics_cache.stats()
@@ -1,37 +1,220 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_, select, func, union_all, update
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime, timezone
-from app.database import get_db
+from typing import List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+import base64
+import io
+import json
+import queue
+import tempfile
+import threading
+from app.config import settings
+from app.database import get_db, get_read_db
 from app.schemas import WorkoutCreate, WorkoutResponse
-from app.models import Workout, WorkoutExercise, Exercise
-from app.dependencies import get_current_user
+from app.models import Workout, WorkoutExercise, Exercise, ArchivedWorkout, ensure_utc
+from app.dependencies import get_current_user, get_user_state
+from app.training_rollups import apply_completed_workout
+from app.workout_import import PARSERS, import_workouts
+from app.workout_export import EXPORTERS, MEDIA_TYPES, export_history
+from app.workout_archive import WORKOUT_COLUMNS, needs_archive
+from app.query_budget import query_budget
+from app.http_cache import history_etag
+from app.training_calendar import TrainingCalendar
+from app.analytics_cache import analytics_cache, bump_history_version
+from app.user_state import user_state_cache
 
 router = APIRouter(prefix="/api/workouts", tags=["workouts"])
 
-@router.get("/", response_model=List[WorkoutResponse])
+def _encode_cursor(workout: Workout) -> str:
+    """Opaque keyset cursor for the (start_time, id) position of a workout (t is null if undated)"""
+    start_time = ensure_utc(workout.start_time)
+    payload = json.dumps({"t": start_time.isoformat() if start_time else None, "id": workout.id})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        start_time = datetime.fromisoformat(payload["t"]) if payload["t"] is not None else None
+        return start_time, int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _workout_list_select(workout_model, user_id: int, start_date, end_date, cursor_position, undated: bool = False):
+    """
+    Workout list columns from one table (hot or archive) with the list filters.
+    Workouts without a start_time sort after every dated one; date filters
+    exclude them unless undated is set (end_date is then an internal bound).
+    """
+    query = select(
+        *[getattr(workout_model, name) for name in WORKOUT_COLUMNS]
+    ).where(workout_model.user_id == user_id)
+    
+    if start_date:
+        query = query.where(workout_model.start_time >= start_date)
+    if end_date:
+        query = query.where(
+            or_(workout_model.start_time < end_date, workout_model.start_time.is_(None))
+            if undated else workout_model.start_time < end_date
+        )
+    
+    if cursor_position:
+        cursor_time, cursor_id = cursor_position
+        if cursor_time is None:
+            # Already among the undated rows at the end
+            query = query.where(workout_model.start_time.is_(None), workout_model.id < cursor_id)
+        else:
+            query = query.where(or_(
+                workout_model.start_time < cursor_time,
+                and_(workout_model.start_time == cursor_time, workout_model.id < cursor_id),
+                workout_model.start_time.is_(None)
+            ))
+    return query
+
+def _fetch_workout_page(db: Session, selects: list, offset: int, limit: int) -> list:
+    """Newest-first page over one select, or over the union of several"""
+    if len(selects) == 1:
+        query = selects[0]
+        columns = query.selected_columns
+    else:
+        history = union_all(*selects).subquery()
+        query = select(history)
+        columns = history.c
+    
+    # DESC puts NULL start_time last on both SQLite and MySQL, matching the keyset above
+    query = query.order_by(columns.start_time.desc(), columns.id.desc())
+    if offset:
+        query = query.offset(offset)
+    return list(db.execute(query.limit(limit)).all())
+
+@router.get("/", response_model=List[WorkoutResponse], dependencies=[Depends(query_budget(5)), Depends(history_etag)])
 def get_workouts(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    current_user = Depends(get_user_state)
 ):
-    workouts = db.query(Workout).filter(
-        Workout.user_id == current_user.id
-    ).offset(skip).limit(limit).all()
+    """
+    Newest first, ordered by (start_time desc, id desc).
+    Pass the X-Next-Cursor response header back as ?cursor= for the next page;
+    skip is only honoured without a cursor (legacy offset paging).
+    start_date / end_date filter on start_time (inclusive / exclusive).
+    """
+    start_date = ensure_utc(start_date)
+    end_date = ensure_utc(end_date)
+    cursor_position = _decode_cursor(cursor) if cursor else None
+    offset = 0 if cursor else skip
+    # Fetch one extra row to know whether another page exists
+    wanted = limit + 1
+    
+    archived_before = ensure_utc(current_user.archived_before)
+    if not needs_archive(archived_before, start_date):
+        workouts = _fetch_workout_page(db, [
+            _workout_list_select(Workout, current_user.id, start_date, end_date, cursor_position)
+        ], offset, wanted)
+    else:
+        # Hot rows newer than the watermark first; only reach into the
+        # archive (plus any older hot rows) once that segment runs out
+        newer = _workout_list_select(
+            Workout, current_user.id, max(filter(None, [start_date, archived_before])), end_date, cursor_position
+        )
+        workouts = _fetch_workout_page(db, [newer], offset, wanted)
+        
+        if len(workouts) < wanted:
+            if offset and not workouts:
+                offset -= db.scalar(select(func.count()).select_from(newer.subquery()))
+            else:
+                offset = 0
+            older_end = min(filter(None, [end_date, archived_before]))
+            workouts += _fetch_workout_page(db, [
+                _workout_list_select(model, current_user.id, start_date, older_end, cursor_position, undated=end_date is None)
+                for model in (Workout, ArchivedWorkout)
+            ], offset, wanted - len(workouts))
+    
+    if len(workouts) > limit:
+        workouts = workouts[:limit]
+        if workouts:
+            response.headers["X-Next-Cursor"] = _encode_cursor(workouts[-1])
+    
     return workouts
 
+@router.get("/export")
+def export_workout_history(
+    format: str = "ndjson",
+    current_user = Depends(get_current_user)
+):
+    """Stream the user's complete history (workouts with their exercises) as NDJSON or CSV"""
+    if format not in EXPORTERS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    user_id = current_user.id
+    
+    def chunks():
+        # Own session: the response body outlives the request dependencies
+        sessions = get_read_db()
+        db = next(sessions)
+        try:
+            yield from export_history(db, user_id, format)
+        finally:
+            sessions.close()
+    
+    return StreamingResponse(
+        chunks(),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="workouts.{format}"'}
+    )
+
+@router.get("/calendar", dependencies=[Depends(query_budget(2)), Depends(history_etag)])
+def get_training_calendar(
+    days: int = 365,
+    current_user = Depends(get_user_state)
+):
+    """
+    Training-day heatmap for the last `days` days, served from the user's
+    calendar bitset. bitmap is base64 little-endian: bit i = start + i days.
+    """
+    if days < 1 or days > 3660:
+        raise HTTPException(status_code=400, detail="days must be between 1 and 3660")
+    
+    calendar = TrainingCalendar.from_bytes(current_user.calendar_start, current_user.training_calendar)
+    today = datetime.now(timezone.utc).date()
+    since = today - timedelta(days=days - 1)
+    bits = calendar.window(since, today)
+    best_streak, current_streak = calendar.streaks(since, today)
+    
+    return {
+        "start": since.isoformat(),
+        "end": today.isoformat(),
+        "days": days,
+        "bitmap": base64.b64encode(bits.to_bytes((days + 7) // 8, "little")).decode(),
+        "training_days": calendar.count(since, today),
+        "best_streak": best_streak,
+        "current_streak": current_streak,
+        "longest_gap_days": calendar.longest_gap(since, today)
+    }
+
 @router.get("/{workout_id}", response_model=WorkoutResponse)
 def get_workout(
     workout_id: int,
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    current_user = Depends(get_user_state)
 ):
     workout = db.query(Workout).filter(
         Workout.id == workout_id,
         Workout.user_id == current_user.id
     ).first()
     
+    if not workout and current_user.archived_before:
+        workout = db.query(ArchivedWorkout).filter(
+            ArchivedWorkout.id == workout_id,
+            ArchivedWorkout.user_id == current_user.id
+        ).first()
+    
     if not workout:
         raise HTTPException(status_code=404, detail="Workout not found")
     return workout
@@ -42,49 +225,117 @@ def create_workout(
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
-    # Validate all exercises exist
-    for ex in workout.exercises:
-        exercise = db.query(Exercise).filter(
-            Exercise.id == ex.exercise_id,
+    # Validate all exercises exist - one IN query for the whole session. Writes
+    # check the database, not this worker's catalog, which may lag other workers
+    exercise_ids = {ex.exercise_id for ex in workout.exercises}
+    active_ids = {
+        exercise_id for (exercise_id,) in db.query(Exercise.id).filter(
+            Exercise.id.in_(exercise_ids),
             Exercise.is_active == True
-        ).first()
-        if not exercise:
+        )
+    } if exercise_ids else set()
+    for ex in workout.exercises:
+        if ex.exercise_id not in active_ids:
             raise HTTPException(status_code=400, detail=f"Exercise with id {ex.exercise_id} not found")
     
-    # Create workout
+    # Create workout with its totals already known
     db_workout = Workout(
         user_id=current_user.id,
         name=workout.name,
-        notes=workout.notes
+        notes=workout.notes,
+        calories_burned=sum(ex.calories for ex in workout.exercises if ex.calories)
     )
     db.add(db_workout)
-    db.commit()
-    db.refresh(db_workout)
+    db.flush()
     
-    # Add exercises to workout
-    total_calories = 0
-    for ex in workout.exercises:
-        workout_exercise = WorkoutExercise(
-            workout_id=db_workout.id,
-            exercise_id=ex.exercise_id,
-            sets=ex.sets,
-            reps=ex.reps,
-            weight_kg=ex.weight_kg,
-            duration_minutes=ex.duration_minutes,
-            distance_km=ex.distance_km,
-            calories=ex.calories
-        )
-        db.add(workout_exercise)
-        
-        if ex.calories:
-            total_calories += ex.calories
+    # Add exercises to workout - a single executemany INSERT
+    if workout.exercises:
+        db.execute(WorkoutExercise.__table__.insert(), [
+            {
+                "workout_id": db_workout.id,
+                "exercise_id": ex.exercise_id,
+                "sets": ex.sets,
+                "reps": ex.reps,
+                "weight_kg": ex.weight_kg,
+                "duration_minutes": ex.duration_minutes,
+                "distance_km": ex.distance_km,
+                "calories": ex.calories
+            }
+            for ex in workout.exercises
+        ])
     
-    # Update workout totals
-    db_workout.calories_burned = total_calories
+    bump_history_version(db, current_user.id)
+    
+    # Serialize before commit so the expired instance isn't reloaded
+    result = WorkoutResponse.model_validate(db_workout)
     db.commit()
-    db.refresh(db_workout)
+    analytics_cache.invalidate_user(current_user.id)
+    user_state_cache.invalidate(current_user.id)
+    
+    return result
+
+async def _spool_request(request: Request):
+    """
+    Receive a streamed request body into a spooled temp file (in memory up
+    to IMPORT_SPOOL_MEMORY_BYTES, on disk beyond). The progress response
+    can't read the body while it streams, so the upload is taken first.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=settings.IMPORT_SPOOL_MEMORY_BYTES)
+    async for chunk in request.stream():
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+@router.post("/import")
+async def import_workout_history(
+    request: Request,
+    format: Optional[str] = None,
+    batch_size: int = 500,
+    current_user = Depends(get_current_user)
+):
+    """
+    Bulk import completed workouts from a streamed NDJSON or CSV body.
+    format defaults from Content-Type (text/csv -> csv, otherwise ndjson).
+    Responds with NDJSON progress: one line per batch as it commits, then
+    the final result (totals and the first rejected records).
+    """
+    fmt = format or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")
+    if fmt not in PARSERS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {fmt}")
     
-    return db_workout
+    user_id = current_user.id
+    spool = await _spool_request(request)
+    progress = queue.Queue()
+    
+    def run_import():
+        # Own session and thread: the import completes even if the client stops reading
+        sessions = get_db()
+        db = next(sessions)
+        try:
+            # Only \n ends a line - CSV quoting handles the rest
+            lines = io.TextIOWrapper(spool, encoding="utf-8", errors="replace", newline="\n")
+            progress.put(import_workouts(db, user_id, lines, fmt, batch_size, on_batch=progress.put))
+        except Exception as e:
+            print(f"❌ Workout import failed for user {user_id}: {e}")
+            progress.put({"error": str(e)})
+        finally:
+            sessions.close()
+            spool.close()
+            # Committed batches count even if a later one failed
+            analytics_cache.invalidate_user(user_id)
+            user_state_cache.invalidate(user_id)
+            progress.put(None)
+    
+    threading.Thread(target=run_import, name=f"workout-import-{user_id}", daemon=True).start()
+    
+    def progress_lines():
+        while True:
+            report = progress.get()
+            if report is None:
+                return
+            yield json.dumps(report) + "\n"
+    
+    return StreamingResponse(progress_lines(), media_type="application/x-ndjson")
 
 @router.post("/{workout_id}/complete")
 def complete_workout(
@@ -103,8 +354,17 @@ def complete_workout(
     if workout.end_time:
         raise HTTPException(status_code=400, detail="Workout already completed")
     
-    # Use timezone-aware datetime
-    workout.end_time = datetime.now(timezone.utc)
+    # Claim the completion atomically - a concurrent complete of the same
+    # workout matches no row here, so the rollups are applied only once
+    claimed = db.execute(
+        update(Workout).where(
+            Workout.id == workout_id,
+            Workout.end_time.is_(None)
+        ).values(end_time=datetime.now(timezone.utc))
+    ).rowcount
+    if not claimed:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Workout already completed")
     
     # Calculate duration if start_time exists
     if workout.start_time:
@@ -119,5 +379,10 @@ def complete_workout(
         duration = (workout.end_time - start_time_aware).total_seconds() / 60
         workout.total_duration_minutes = round(duration, 2)
     
+    # Fold into the daily rollup in the same transaction (also bumps history_version)
+    apply_completed_workout(db, workout)
+    
     db.commit()
+    analytics_cache.invalidate_user(current_user.id)
+    user_state_cache.invalidate(current_user.id)
     return {"status": "workout_completed", "workout_id": workout_id}
@@ -70,7 +70,7 @@ class WorkoutResponse(BaseModel):
     user_id: int
     name: str
     notes: Optional[str]
-    start_time: datetime
+    start_time: Optional[datetime]
     end_time: Optional[datetime]
     total_duration_minutes: Optional[float]
     calories_burned: Optional[int]
@@ -0,0 +1,68 @@
+"""
+🪶 SQLite Production Profile
+Small deployments run on the default SQLite DATABASE_URL. This applies
+WAL journaling and tuning pragmas on every new connection, and funnels
+ORM writes through one in-process writer lock, so workout writes queue
+behind each other instead of failing with "database is locked". Readers
+keep using the pool, and in WAL mode they never block the writer.
+"""
+
+import threading
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from app.config import settings
+
+_write_lock = threading.Lock()
+
+def is_file_sqlite(url: str) -> bool:
+    """True for on-disk SQLite URLs (in-memory databases cannot use WAL)"""
+    return url.startswith("sqlite") and ":memory:" not in url and not url.rstrip("/").endswith(":")
+
+def apply_pragmas(engine: Engine) -> None:
+    """Run the profile pragmas on each new DBAPI connection"""
+    pragmas = [
+        ("journal_mode", "WAL"),
+        ("synchronous", "NORMAL"),
+        ("busy_timeout", settings.SQLITE_BUSY_TIMEOUT_MS),
+        ("cache_size", -settings.SQLITE_CACHE_SIZE_KB),  # negative = KiB
+        ("mmap_size", settings.SQLITE_MMAP_SIZE),
+    ]
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+def _acquire_write_lock(session: Session) -> None:
+    if session.info.get("holds_write_lock"):
+        return
+    # Bounded wait - past busy_timeout fall through to SQLite's own locking
+    if _write_lock.acquire(timeout=settings.SQLITE_BUSY_TIMEOUT_MS / 1000):
+        session.info["holds_write_lock"] = True
+
+def _release_write_lock(session: Session) -> None:
+    if session.info.pop("holds_write_lock", False):
+        _write_lock.release()
+
+def serialize_writes(session_factory: sessionmaker) -> None:
+    """Hold the writer lock from a session's first write until its transaction ends"""
+
+    @event.listens_for(session_factory, "before_flush")
+    def _before_flush(session, flush_context, instances):
+        if session.new or session.dirty or session.deleted:
+            _acquire_write_lock(session)
+
+    @event.listens_for(session_factory, "do_orm_execute")
+    def _before_bulk_write(orm_execute_state):
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            _acquire_write_lock(orm_execute_state.session)
+
+    @event.listens_for(session_factory, "after_transaction_end")
+    def _after_transaction_end(session, transaction):
+        if transaction.parent is None:
+            _release_write_lock(session)
@@ -0,0 +1,130 @@
+"""
+🗓️ Training Day Bitset Calendar
+One bit per day since the user's first training day, stored as bytes on
+the user row (bit i = calendar_start + i days, little-endian). Counts,
+streaks and gaps are bit operations on a Python int instead of sorting
+date lists, and a year of activity serializes to ~46 bytes.
+"""
+
+from datetime import date, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+# Training days at most this many days apart belong to the same streak
+STREAK_GAP_DAYS = 3
+
+def _popcount(bits: int) -> int:
+    return bin(bits).count("1")
+
+def _mask(length: int) -> int:
+    return (1 << length) - 1 if length > 0 else 0
+
+class TrainingCalendar:
+    """Immutable bitset of training days"""
+
+    __slots__ = ("start", "bits")
+
+    def __init__(self, start: Optional[date] = None, bits: int = 0):
+        self.start = start if bits else None
+        self.bits = bits
+
+    @classmethod
+    def from_bytes(cls, start: Optional[date], data: Optional[bytes]) -> "TrainingCalendar":
+        if start is None or not data:
+            return cls()
+        return cls(start, int.from_bytes(data, "little"))
+
+    @classmethod
+    def from_dates(cls, days: Iterable[date]) -> "TrainingCalendar":
+        days = list(days)
+        if not days:
+            return cls()
+        start = min(days)
+        bits = 0
+        for day in days:
+            bits |= 1 << (day - start).days
+        return cls(start, bits)
+
+    def to_bytes(self) -> Optional[bytes]:
+        if not self.bits:
+            return None
+        return self.bits.to_bytes((self.bits.bit_length() + 7) // 8, "little")
+
+    def with_day(self, day: date) -> "TrainingCalendar":
+        """Calendar with day marked (shifts the start back for back-dated days)"""
+        if self.start is None:
+            return TrainingCalendar(day, 1)
+        offset = (day - self.start).days
+        if offset >= 0:
+            return TrainingCalendar(self.start, self.bits | (1 << offset))
+        return TrainingCalendar(day, (self.bits << -offset) | 1)
+
+    def __contains__(self, day: date) -> bool:
+        if self.start is None or day < self.start:
+            return False
+        return bool(self.bits >> (day - self.start).days & 1)
+
+    def window(self, since: date, until: date) -> int:
+        """Bits for days since..until (both inclusive), bit 0 = since"""
+        if self.start is None or until < since:
+            return 0
+        offset = (since - self.start).days
+        bits = self.bits >> offset if offset >= 0 else self.bits << -offset
+        return bits & _mask((until - since).days + 1)
+
+    def count(self, since: date, until: date) -> int:
+        """Training days between since and until (both inclusive)"""
+        return _popcount(self.window(since, until))
+
+    def dates(self, since: date, until: date) -> List[date]:
+        """Training dates between since and until, oldest first"""
+        bits = self.window(since, until)
+        days = []
+        while bits:
+            low = bits & -bits
+            days.append(since + timedelta(days=low.bit_length() - 1))
+            bits ^= low
+        return days
+
+    def streaks(self, since: date, today: date) -> Tuple[int, int]:
+        """
+        (best, current) streak in training days between since and today, where
+        gaps of up to STREAK_GAP_DAYS days keep a streak alive. The current
+        streak is 0 unless the last training day is within the gap of today.
+        """
+        bits = self.window(since, today)
+        if not bits:
+            return 0, 0
+
+        # Smear each training day over the following gap days so a streak
+        # becomes one contiguous run of set bits
+        covered = bits
+        for shift in range(1, STREAK_GAP_DAYS):
+            covered |= bits << shift
+
+        best = current = 0
+        while covered:
+            low = covered & -covered
+            run = covered & ~(covered + low)
+            current = _popcount(bits & run)
+            best = max(best, current)
+            covered &= ~run
+
+        last_day = since + timedelta(days=bits.bit_length() - 1)
+        if (today - last_day).days > STREAK_GAP_DAYS:
+            current = 0
+        return best, current
+
+    def longest_gap(self, since: date, until: date) -> int:
+        """Longest run of rest days between two training days in the window"""
+        bits = self.window(since, until)
+        if not bits:
+            return 0
+        bits >>= (bits & -bits).bit_length() - 1
+        gaps = ~bits & _mask(bits.bit_length())
+        longest = 0
+        while gaps:
+            low = gaps & -gaps
+            run = gaps & ~(gaps + low)
+            longest = max(longest, _popcount(run))
+            gaps &= ~run
+        return longest
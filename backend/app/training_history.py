@@ -0,0 +1,171 @@
+"""
+📚 Training History Snapshot
+Load a user's completed workouts once per request and share them
+across every analytics engine (recommendation, knowledge, override, projections).
+"""
+
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models import ensure_utc
+from app.history_queries import (
+    WorkoutRow,
+    SetRow,
+    MuscleActivityRow,
+    DaySummaryRow,
+    ExerciseProgressRow,
+    WindowTotals,
+    fetch_workout_rows,
+    fetch_set_rows,
+    fetch_muscle_activity,
+    fetch_day_summaries,
+    fetch_exercise_progress,
+    fetch_window_totals
+)
+from app.training_calendar import TrainingCalendar
+from app.user_state import UserState, load_user_state
+
+T = TypeVar("T")
+
+class TrainingHistory:
+    """
+    Per-request snapshot of a user's completed training history.
+    Workouts and exercise entries are loaded as column-projected rows
+    (one SELECT each) the first time they are needed, then reused.
+    """
+
+    def __init__(self, db: Session, user_id: int, user: Optional[UserState] = None):
+        self.db = db
+        self.user_id = user_id
+        self.now = datetime.now(timezone.utc)
+        self._user = user
+        self._workouts = None
+        self._sets = None
+        self._exercise_progress: Dict[Optional[date], List[ExerciseProgressRow]] = {}
+        self._workouts_since: Dict[datetime, List[WorkoutRow]] = {}
+        self._sets_since: Dict[datetime, List[SetRow]] = {}
+        self._muscle_activity: Dict[datetime, List[MuscleActivityRow]] = {}
+        self._window_totals: Dict[Tuple[Optional[date], Optional[date]], WindowTotals] = {}
+        self._training_days: Dict[date, List[DaySummaryRow]] = {}
+
+    @property
+    def user(self) -> Optional[UserState]:
+        """User state columns (reuses the request's cached state when provided)"""
+        if self._user is None:
+            self._user = load_user_state(self.db, self.user_id)
+        return self._user
+
+    @property
+    def archived_before(self) -> Optional[datetime]:
+        """Archive watermark - queries reaching before it also read the archive"""
+        user = self.user
+        return ensure_utc(user.archived_before) if user is not None else None
+
+    @property
+    def workouts(self) -> List[WorkoutRow]:
+        """All completed workouts, oldest first"""
+        if self._workouts is None:
+            self._workouts = fetch_workout_rows(self.db, self.user_id, archived_before=self.archived_before)
+        return self._workouts
+
+    @property
+    def sets(self) -> List[SetRow]:
+        """All exercise entries from completed workouts, oldest first"""
+        if self._sets is None:
+            self._sets = fetch_set_rows(self.db, self.user_id, archived_before=self.archived_before)
+        return self._sets
+
+    def workouts_since(self, cutoff: datetime) -> List[WorkoutRow]:
+        """Completed workouts started at or after cutoff, oldest first"""
+        cutoff = ensure_utc(cutoff)
+        if self._workouts is None:
+            # Windowed query so short ranges never scan the archive
+            if cutoff not in self._workouts_since:
+                self._workouts_since[cutoff] = fetch_workout_rows(
+                    self.db, self.user_id, cutoff, archived_before=self.archived_before
+                )
+            return self._workouts_since[cutoff]
+        return [w for w in self._workouts if w.start_time and w.start_time >= cutoff]
+
+    def sets_since(self, cutoff: datetime) -> List[SetRow]:
+        """Exercise entries from workouts started at or after cutoff, oldest first"""
+        cutoff = ensure_utc(cutoff)
+        if self._sets is None:
+            if cutoff not in self._sets_since:
+                self._sets_since[cutoff] = fetch_set_rows(
+                    self.db, self.user_id, cutoff, archived_before=self.archived_before
+                )
+            return self._sets_since[cutoff]
+        return [s for s in self._sets if s.start_time and s.start_time >= cutoff]
+
+    def exercise_progress(self, cutoff: Optional[datetime] = None) -> List[ExerciseProgressRow]:
+        """Daily best-e1RM rows per exercise from the cutoff's UTC date (None = all time)"""
+        since = ensure_utc(cutoff).date() if cutoff is not None else None
+        if since not in self._exercise_progress:
+            self._exercise_progress[since] = fetch_exercise_progress(self.db, self.user_id, since)
+        return self._exercise_progress[since]
+
+    def muscle_activity(self, cutoff: datetime) -> List[MuscleActivityRow]:
+        """Per-muscle entry counts and last-trained times since cutoff (SQL GROUP BY)"""
+        if cutoff not in self._muscle_activity:
+            self._muscle_activity[cutoff] = fetch_muscle_activity(
+                self.db, self.user_id, cutoff, archived_before=self.archived_before
+            )
+        return self._muscle_activity[cutoff]
+
+    def window_totals(self, since: Optional[date] = None, until: Optional[date] = None) -> WindowTotals:
+        """Training totals from since to until (both inclusive) - two running-total rows, one query"""
+        key = (since, until)
+        if key not in self._window_totals:
+            self._window_totals[key] = fetch_window_totals(self.db, self.user_id, since, until)
+        return self._window_totals[key]
+
+    def training_days(self, cutoff: datetime) -> List[DaySummaryRow]:
+        """Daily rollup rows from the cutoff's UTC date onwards (at most days_back rows)"""
+        since = ensure_utc(cutoff).date()
+        if since not in self._training_days:
+            self._training_days[since] = fetch_day_summaries(self.db, self.user_id, since)
+        return self._training_days[since]
+
+    def calendar(self) -> TrainingCalendar:
+        """Training-day bitset kept on the user row (no query beyond the user)"""
+        user = self.user
+        if user is None:
+            return TrainingCalendar()
+        return TrainingCalendar.from_bytes(user.calendar_start, user.training_calendar)
+
+    @property
+    def first_workout_at(self) -> Optional[datetime]:
+        """Start of the earliest completed workout (kept on the user row)"""
+        user = self.user
+        return ensure_utc(user.first_workout_at) if user is not None else None
+
+    @property
+    def last_workout_at(self) -> Optional[datetime]:
+        """Start of the most recent completed workout (kept on the user row)"""
+        user = self.user
+        return ensure_utc(user.last_workout_at) if user is not None else None
+
+class AsyncTrainingHistory:
+    """
+    TrainingHistory for async def handlers. The engines stay synchronous;
+    run() executes them on the AsyncSession's connection via run_sync, so
+    every query is awaited instead of blocking the event loop.
+    """
+
+    def __init__(self, db: AsyncSession, user_id: int, user: Optional[UserState] = None):
+        self.db = db
+        self.user_id = user_id
+        self._user = user
+        self._history: Optional[TrainingHistory] = None
+
+    def _bind(self, session: Session) -> TrainingHistory:
+        # One snapshot per request, so memoized loads are shared across run() calls
+        if self._history is None:
+            self._history = TrainingHistory(session, self.user_id, self._user)
+        return self._history
+
+    async def run(self, fn: Callable[[TrainingHistory], T]) -> T:
+        """Await fn(history) with all of its queries on the async connection"""
+        return await self.db.run_sync(lambda session: fn(self._bind(session)))
@@ -0,0 +1,568 @@
+"""
+📅 Training Rollups
+Maintain two compact per-user series so analytics never rescan raw
+workouts and workout_exercises:
+- training_day_summary: one row per training day (consistency, streak,
+  neglect and distribution metrics) with running totals, so any window's
+  totals are two row reads
+- exercise_progress: best estimated 1RM per exercise per training day
+  (strength projections and progression quality)
+plus the first/last workout times, completed count and training-day
+bitset calendar on users (training age, recency and streaks become a
+primary-key read).
+
+Backfill / repair with: python -m app.training_rollups rebuild [--user-id N]
+Check for drift with:   python -m app.training_rollups verify [--user-id N]
+"""
+
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import Date, bindparam, case, func, or_, select, update
+from sqlalchemy.orm import Session
+from app.models import User, Workout, Exercise, TrainingDaySummary, ExerciseProgress, ensure_utc
+from app.recommendation import MuscleTracker
+from app.workout_archive import HOT_TABLES, ARCHIVE_TABLES
+from app.history_queries import fetch_training_dates
+from app.training_calendar import TrainingCalendar
+
+# Entry tuples: (exercise_id, exercise_type, sets, reps, weight_kg, muscle_category, muscle_group)
+
+def estimate_1rm(weight_kg: float, reps: Optional[int]) -> float:
+    """Epley estimated one-rep max (a missing rep count counts as a single)"""
+    return weight_kg * (1 + (reps or 1) / 30)
+
+class DayContribution:
+    """What one or more completed workouts add to a training day"""
+
+    __slots__ = ("session_count", "total_sets", "total_volume_kg", "calories", "muscle_sets", "muscle_entries")
+
+    def __init__(self):
+        self.session_count = 0
+        self.total_sets = 0
+        self.total_volume_kg = 0.0
+        self.calories = 0
+        self.muscle_sets: Dict[str, int] = defaultdict(int)
+        self.muscle_entries: Dict[str, int] = defaultdict(int)
+
+    def add_workout(self, calories: Optional[int], entries: Iterable[Tuple]) -> None:
+        self.session_count += 1
+        self.calories += calories or 0
+
+        for _, _, sets, reps, weight_kg, muscle_category, muscle_group in entries:
+            sets = sets or 0
+            self.total_sets += sets
+            if sets and reps and weight_kg:
+                self.total_volume_kg += sets * reps * weight_kg
+
+            if muscle_group:
+                muscle = muscle_category or MuscleTracker.classify_muscle_group(muscle_group)
+                self.muscle_sets[muscle] += sets
+                self.muscle_entries[muscle] += 1
+
+class ExerciseDayBest:
+    """Best weighted strength set for one exercise on one training day"""
+
+    __slots__ = ("best_e1rm", "top_weight", "best_weight", "reps", "sets")
+
+    def __init__(self):
+        self.best_e1rm = 0.0
+        self.top_weight = 0.0
+        self.best_weight = 0.0
+        self.reps = None
+        self.sets = 0
+
+    def add_set(self, sets: Optional[int], reps: Optional[int], weight_kg: float) -> None:
+        e1rm = estimate_1rm(weight_kg, reps)
+        if e1rm > self.best_e1rm:
+            # best_e1rm, best_weight and reps always describe the same set
+            self.best_e1rm = e1rm
+            self.best_weight = weight_kg
+            self.reps = reps or 1
+        self.top_weight = max(self.top_weight, weight_kg)
+        self.sets += sets or 0
+
+def _exercise_bests(entries: Iterable[Tuple], bests: Dict[int, ExerciseDayBest]) -> None:
+    """Fold weighted strength entries into per-exercise day bests"""
+    for exercise_id, exercise_type, sets, reps, weight_kg, _, _ in entries:
+        if exercise_type == "strength" and weight_kg and weight_kg > 0:
+            if exercise_id not in bests:
+                bests[exercise_id] = ExerciseDayBest()
+            bests[exercise_id].add_set(sets, reps, weight_kg)
+
+def _workout_entries(db: Session, *criteria, tables=HOT_TABLES) -> Dict[int, List[Tuple]]:
+    """Entry tuples for workouts matching criteria, keyed by workout id"""
+    workout_model, entry_model = tables
+    rows = db.query(
+        entry_model.workout_id,
+        entry_model.exercise_id,
+        Exercise.exercise_type,
+        entry_model.sets,
+        entry_model.reps,
+        entry_model.weight_kg,
+        Exercise.muscle_category,
+        Exercise.muscle_group
+    ).join(
+        workout_model, workout_model.id == entry_model.workout_id
+    ).join(
+        Exercise, Exercise.id == entry_model.exercise_id
+    ).filter(
+        *criteria
+    ).order_by(entry_model.id.asc()).all()
+
+    entries = defaultdict(list)
+    for workout_id, *entry in rows:
+        entries[workout_id].append(tuple(entry))
+    return entries
+
+def _new_summary(user_id: int, day: date, contribution: DayContribution) -> TrainingDaySummary:
+    """Fresh day row holding a single contribution"""
+    return TrainingDaySummary(
+        user_id=user_id,
+        date=day,
+        session_count=contribution.session_count,
+        total_sets=contribution.total_sets,
+        total_volume_kg=round(contribution.total_volume_kg, 2),
+        calories=contribution.calories,
+        muscle_sets=dict(contribution.muscle_sets),
+        muscle_entries=dict(contribution.muscle_entries)
+    )
+
+def _new_progress(user_id: int, exercise_id: int, day: date, best: ExerciseDayBest) -> ExerciseProgress:
+    return ExerciseProgress(
+        user_id=user_id,
+        exercise_id=exercise_id,
+        date=day,
+        best_e1rm=round(best.best_e1rm, 2),
+        top_weight=best.top_weight,
+        best_weight=best.best_weight,
+        reps=best.reps,
+        sets=best.sets
+    )
+
+def _merge_into_day(db: Session, user_id: int, day: date, contribution: DayContribution) -> None:
+    """Add a contribution to the (user_id, date) row, creating it if needed"""
+    summary = db.get(TrainingDaySummary, (user_id, day))
+    if summary is None:
+        db.add(_new_summary(user_id, day, contribution))
+        return
+
+    summary.session_count += contribution.session_count
+    summary.total_sets += contribution.total_sets
+    summary.total_volume_kg = round(summary.total_volume_kg + contribution.total_volume_kg, 2)
+    summary.calories += contribution.calories
+
+    # Reassign (not mutate) so the JSON columns are flagged dirty
+    muscle_sets = dict(summary.muscle_sets or {})
+    for muscle, sets in contribution.muscle_sets.items():
+        muscle_sets[muscle] = muscle_sets.get(muscle, 0) + sets
+    summary.muscle_sets = muscle_sets
+
+    muscle_entries = dict(summary.muscle_entries or {})
+    for muscle, count in contribution.muscle_entries.items():
+        muscle_entries[muscle] = muscle_entries.get(muscle, 0) + count
+    summary.muscle_entries = muscle_entries
+
+def _add_counts(total: Optional[Dict[str, int]], counts: Optional[Dict[str, int]]) -> Dict[str, int]:
+    merged = dict(total or {})
+    for key, count in (counts or {}).items():
+        merged[key] = merged.get(key, 0) + count
+    return merged
+
+def accumulate_day_totals(db: Session, user_id: Optional[int] = None, since: Optional[date] = None) -> int:
+    """
+    Recompute the running totals (cum_* columns) of training_day_summary
+    from since onwards (all days when None), for one user or all. Reads and
+    writes only those columns - migration 9 backfills with it. Does not
+    commit. Returns the number of rows updated.
+    """
+    summary = TrainingDaySummary.__table__
+    if user_id is not None:
+        user_ids = [user_id]
+    else:
+        user_ids = [uid for (uid,) in db.execute(select(summary.c.user_id).distinct())]
+
+    params = []
+    for uid in user_ids:
+        running = [0, 0, 0, 0.0, 0, {}, {}]
+        if since is not None:
+            previous = db.execute(
+                select(
+                    summary.c.cum_training_days, summary.c.cum_sessions, summary.c.cum_sets,
+                    summary.c.cum_volume_kg, summary.c.cum_calories,
+                    summary.c.cum_muscle_sets, summary.c.cum_muscle_entries
+                ).where(
+                    summary.c.user_id == uid, summary.c.date < since
+                ).order_by(summary.c.date.desc()).limit(1)
+            ).first()
+            if previous is not None:
+                running = [value if value is not None else default for value, default in zip(previous, running)]
+
+        days = select(
+            summary.c.date, summary.c.session_count, summary.c.total_sets, summary.c.total_volume_kg,
+            summary.c.calories, summary.c.muscle_sets, summary.c.muscle_entries
+        ).where(summary.c.user_id == uid)
+        if since is not None:
+            days = days.where(summary.c.date >= since)
+
+        for day, sessions, sets, volume, calories, muscle_sets, muscle_entries in db.execute(days.order_by(summary.c.date.asc())):
+            running[0] += 1 if sessions else 0
+            running[1] += sessions or 0
+            running[2] += sets or 0
+            running[3] = round(running[3] + (volume or 0.0), 2)
+            running[4] += calories or 0
+            running[5] = _add_counts(running[5], muscle_sets)
+            running[6] = _add_counts(running[6], muscle_entries)
+            params.append({
+                "uid": uid, "day": day,
+                "cum_training_days": running[0], "cum_sessions": running[1], "cum_sets": running[2],
+                "cum_volume_kg": running[3], "cum_calories": running[4],
+                "cum_muscle_sets": running[5], "cum_muscle_entries": running[6]
+            })
+
+    if params:
+        db.execute(
+            update(summary).where(
+                summary.c.user_id == bindparam("uid"),
+                summary.c.date == bindparam("day")
+            ).values({
+                column: bindparam(column)
+                for column in (
+                    "cum_training_days", "cum_sessions", "cum_sets", "cum_volume_kg",
+                    "cum_calories", "cum_muscle_sets", "cum_muscle_entries"
+                )
+            }),
+            params
+        )
+    return len(params)
+
+def _merge_progress(db: Session, user_id: int, day: date, bests: Dict[int, ExerciseDayBest]) -> None:
+    """Fold day bests into exercise_progress (one SELECT for all exercises)"""
+    if not bests:
+        return
+    existing = {
+        row.exercise_id: row
+        for row in db.query(ExerciseProgress).filter(
+            ExerciseProgress.user_id == user_id,
+            ExerciseProgress.date == day,
+            ExerciseProgress.exercise_id.in_(list(bests))
+        )
+    }
+    for exercise_id, best in bests.items():
+        row = existing.get(exercise_id)
+        if row is None:
+            db.add(_new_progress(user_id, exercise_id, day, best))
+            continue
+        if best.best_e1rm > (row.best_e1rm or 0):
+            row.best_e1rm = round(best.best_e1rm, 2)
+            row.best_weight = best.best_weight
+            row.reps = best.reps
+        row.top_weight = max(row.top_weight or 0, best.top_weight)
+        row.sets = (row.sets or 0) + best.sets
+
+def _lock_user(db: Session, user_id: int) -> TrainingCalendar:
+    """
+    Lock the user row (SELECT ... FOR UPDATE) and return its calendar.
+    Every rollup write for a user happens under this lock, so concurrent
+    completions serialize instead of losing read-modify-write updates.
+    """
+    calendar_start, calendar_bytes = db.execute(
+        select(User.calendar_start, User.training_calendar).where(User.id == user_id).with_for_update()
+    ).one()
+    return TrainingCalendar.from_bytes(calendar_start, calendar_bytes)
+
+def _touch_user_stats(db: Session, user_id: int, started_at, day: date, calendar: TrainingCalendar) -> None:
+    """
+    Count one more completed workout, mark its day in the calendar and bump
+    the history version - all columns in one UPDATE (caller holds _lock_user).
+    """
+    calendar = calendar.with_day(day)
+
+    db.execute(
+        update(User).where(User.id == user_id).values(
+            completed_workout_count=func.coalesce(User.completed_workout_count, 0) + 1,
+            first_workout_at=case(
+                (or_(User.first_workout_at.is_(None), User.first_workout_at > started_at), started_at),
+                else_=User.first_workout_at
+            ),
+            last_workout_at=case(
+                (or_(User.last_workout_at.is_(None), User.last_workout_at < started_at), started_at),
+                else_=User.last_workout_at
+            ),
+            calendar_start=calendar.start,
+            training_calendar=calendar.to_bytes(),
+            history_version=func.coalesce(User.history_version, 0) + 1
+        ).execution_options(synchronize_session=False)
+    )
+
+def apply_completed_workout(db: Session, workout: Workout) -> None:
+    """
+    Fold a just-completed workout into its training day and exercise series.
+    Does not commit - call inside the same transaction that sets end_time.
+    """
+    # Lock first: the day and progress merges below read, add and write back
+    calendar = _lock_user(db, workout.user_id)
+
+    day = ensure_utc(workout.start_time or workout.end_time).date()
+    entries = _workout_entries(db, Workout.id == workout.id).get(workout.id, [])
+
+    contribution = DayContribution()
+    contribution.add_workout(workout.calories_burned, entries)
+    _merge_into_day(db, workout.user_id, day, contribution)
+    # Running totals from this day on - one row unless the workout is back-dated
+    db.flush()
+    accumulate_day_totals(db, workout.user_id, since=day)
+
+    bests: Dict[int, ExerciseDayBest] = {}
+    _exercise_bests(entries, bests)
+    _merge_progress(db, workout.user_id, day, bests)
+
+    _touch_user_stats(db, workout.user_id, ensure_utc(workout.start_time or workout.end_time), day, calendar)
+
+# --------------------------------------------------
+# REBUILD
+# --------------------------------------------------
+def _users_with_history(db: Session) -> List[int]:
+    return sorted({
+        uid
+        for workout_model, _ in (HOT_TABLES, ARCHIVE_TABLES)
+        for (uid,) in db.query(workout_model.user_id).filter(
+            workout_model.end_time.isnot(None)
+        ).distinct()
+    })
+
+def _completed_workouts(db: Session, user_id: int) -> Iterator[Tuple[date, Optional[int], List[Tuple]]]:
+    """(day, calories, entries) for each completed workout, archived ones included"""
+    for tables in (HOT_TABLES, ARCHIVE_TABLES):
+        workout_model, _ = tables
+        workouts = db.query(
+            workout_model.id,
+            workout_model.start_time,
+            workout_model.end_time,
+            workout_model.calories_burned
+        ).filter(
+            workout_model.user_id == user_id,
+            workout_model.end_time.isnot(None)
+        ).all()
+        if not workouts:
+            continue
+
+        entries = _workout_entries(
+            db, workout_model.user_id == user_id, workout_model.end_time.isnot(None), tables=tables
+        )
+        for workout_id, start_time, end_time, calories in workouts:
+            yield ensure_utc(start_time or end_time).date(), calories, entries.get(workout_id, [])
+
+def _clear(db: Session, model, user_id: Optional[int]) -> List[int]:
+    """Delete a rollup's rows (all users, or one) and return the users to rebuild"""
+    query = db.query(model)
+    if user_id is not None:
+        query = query.filter(model.user_id == user_id)
+    query.delete(synchronize_session=False)
+    return _users_with_history(db) if user_id is None else [user_id]
+
+def rebuild_day_summaries(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Recompute training_day_summary from raw workouts, archived ones included
+    (all users, or one). Does not commit. Returns the number of day rows written.
+    """
+    written = 0
+    for uid in _clear(db, TrainingDaySummary, user_id):
+        days: Dict[date, DayContribution] = defaultdict(DayContribution)
+        for day, calories, entries in _completed_workouts(db, uid):
+            days[day].add_workout(calories, entries)
+        if not days:
+            continue
+
+        db.add_all([
+            _new_summary(uid, day, contribution)
+            for day, contribution in days.items()
+        ])
+        db.flush()
+        written += len(days)
+
+    return written
+
+def rebuild_exercise_progress(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Recompute exercise_progress from raw workouts, archived ones included
+    (all users, or one). Does not commit. Returns the number of rows written.
+    """
+    written = 0
+    for uid in _clear(db, ExerciseProgress, user_id):
+        days: Dict[date, Dict[int, ExerciseDayBest]] = defaultdict(dict)
+        for day, _, entries in _completed_workouts(db, uid):
+            _exercise_bests(entries, days[day])
+
+        rows = [
+            _new_progress(uid, exercise_id, day, best)
+            for day, bests in days.items()
+            for exercise_id, best in bests.items()
+        ]
+        if not rows:
+            continue
+        db.add_all(rows)
+        db.flush()
+        written += len(rows)
+
+    return written
+
+def rebuild_best_weights(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Recompute exercise_progress.best_weight from raw workouts, archived ones
+    included (all users, or one). Writes only that column - migration 10
+    backfills with it. Does not commit. Returns the number of rows updated.
+    """
+    progress = ExerciseProgress.__table__
+    params = []
+    for uid in ([user_id] if user_id is not None else _users_with_history(db)):
+        days: Dict[date, Dict[int, ExerciseDayBest]] = defaultdict(dict)
+        for day, _, entries in _completed_workouts(db, uid):
+            _exercise_bests(entries, days[day])
+        params.extend(
+            {"uid": uid, "eid": exercise_id, "day": day, "best_weight": best.best_weight}
+            for day, bests in days.items()
+            for exercise_id, best in bests.items()
+        )
+
+    if params:
+        db.execute(
+            update(progress).where(
+                progress.c.user_id == bindparam("uid"),
+                progress.c.exercise_id == bindparam("eid"),
+                progress.c.date == bindparam("day")
+            ).values(best_weight=bindparam("best_weight")),
+            params
+        )
+    return len(params)
+
+def rebuild_workout_stats(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Recompute first/last workout times and completed counts from raw
+    workouts, archived ones included (all users, or one). Writes only those
+    three columns - migration 6 backfills with it. Does not commit.
+    Returns the number of users with history.
+    """
+    stats: Dict[int, list] = {}
+    for workout_model, _ in (HOT_TABLES, ARCHIVE_TABLES):
+        started = func.coalesce(workout_model.start_time, workout_model.end_time)
+        criteria = [workout_model.end_time.isnot(None)]
+        if user_id is not None:
+            criteria.append(workout_model.user_id == user_id)
+
+        for uid, first, last, count in db.query(
+            workout_model.user_id, func.min(started), func.max(started), func.count(workout_model.id)
+        ).filter(*criteria).group_by(workout_model.user_id):
+            first, last = ensure_utc(first), ensure_utc(last)
+            if uid not in stats:
+                stats[uid] = [first, last, count]
+            else:
+                entry = stats[uid]
+                entry[0] = min(entry[0], first)
+                entry[1] = max(entry[1], last)
+                entry[2] += count
+
+    reset = update(User).values(first_workout_at=None, last_workout_at=None, completed_workout_count=0)
+    if user_id is not None:
+        reset = reset.where(User.id == user_id)
+    db.execute(reset.execution_options(synchronize_session=False))
+
+    for uid, (first, last, count) in stats.items():
+        db.execute(
+            update(User).where(User.id == uid).values(
+                first_workout_at=first,
+                last_workout_at=last,
+                completed_workout_count=count
+            ).execution_options(synchronize_session=False)
+        )
+    return len(stats)
+
+def rebuild_training_calendars(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Recompute training-day calendars from raw workouts, archived ones
+    included (all users, or one). Writes only calendar_start and
+    training_calendar - migration 7 backfills with it. Does not commit.
+    Returns the number of users with history.
+    """
+    training_dates: Dict[int, set] = defaultdict(set)
+    for workout_model, _ in (HOT_TABLES, ARCHIVE_TABLES):
+        started = func.coalesce(workout_model.start_time, workout_model.end_time)
+        criteria = [workout_model.end_time.isnot(None)]
+        if user_id is not None:
+            criteria.append(workout_model.user_id == user_id)
+
+        day = func.date(started, type_=Date)
+        for uid, training_day in db.query(workout_model.user_id, day).filter(*criteria).group_by(workout_model.user_id, day):
+            training_dates[uid].add(training_day)
+
+    reset = update(User).values(calendar_start=None, training_calendar=None)
+    if user_id is not None:
+        reset = reset.where(User.id == user_id)
+    db.execute(reset.execution_options(synchronize_session=False))
+
+    for uid, days in training_dates.items():
+        calendar = TrainingCalendar.from_dates(days)
+        db.execute(
+            update(User).where(User.id == uid).values(
+                calendar_start=calendar.start,
+                training_calendar=calendar.to_bytes()
+            ).execution_options(synchronize_session=False)
+        )
+    return len(training_dates)
+
+def rebuild_user_stats(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Recompute every denormalized history column on users (workout stats and
+    training calendars). Does not commit. Returns the number of users with history.
+    """
+    users = rebuild_workout_stats(db, user_id)
+    rebuild_training_calendars(db, user_id)
+    return users
+
+def find_day_drift(db: Session, user_id: Optional[int] = None) -> Dict[int, Tuple[List[date], List[date]]]:
+    """
+    Compare training_day_summary dates with the distinct training dates of
+    the raw workouts (grouped in SQL). Returns {user_id: (missing, extra)}
+    for users whose rollup disagrees.
+    """
+    drift = {}
+    for uid in _users_with_history(db) if user_id is None else [user_id]:
+        archived_before = db.query(User.archived_before).filter(User.id == uid).scalar()
+        expected = set(fetch_training_dates(db, uid, archived_before=ensure_utc(archived_before)))
+        actual = {
+            day for (day,) in db.query(TrainingDaySummary.date).filter(
+                TrainingDaySummary.user_id == uid,
+                TrainingDaySummary.session_count > 0
+            )
+        }
+        if expected != actual:
+            drift[uid] = (sorted(expected - actual), sorted(actual - expected))
+    return drift
+
+if __name__ == "__main__":
+    import argparse
+    from app.database import Base, SessionLocal, engine
+
+    parser = argparse.ArgumentParser(description="Maintain training rollups")
+    parser.add_argument("command", choices=["rebuild", "verify"])
+    parser.add_argument("--user-id", type=int, default=None)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if args.command == "verify":
+            drift = find_day_drift(db, args.user_id)
+            for uid, (missing, extra) in drift.items():
+                print(f"⚠️ User {uid}: {len(missing)} training days missing from the rollup, {len(extra)} extra")
+            print("✅ Rollups match raw workouts" if not drift else f"❌ {len(drift)} users drifted - run rebuild")
+            raise SystemExit(1 if drift else 0)
+
+        days = rebuild_day_summaries(db, args.user_id)
+        accumulate_day_totals(db, args.user_id)
+        progress = rebuild_exercise_progress(db, args.user_id)
+        users = rebuild_user_stats(db, args.user_id)
+        db.commit()
+        print(f"✅ Rebuilt {days} training day rows, {progress} exercise progress rows and stats for {users} users")
+    finally:
+        db.close()
@@ -0,0 +1,103 @@
+"""
+🧭 Per-User History State
+Analytics, ETag and calendar requests need a handful of users columns -
+history_version, the archive watermark, the training calendar and the
+first/last workout times - not the whole row. Those are cached per worker
+for USER_STATE_CACHE_TTL_SECONDS, so a warm request (a 304 included)
+doesn't SELECT the users row at all. Writes on this worker drop the entry
+together with the user's analytics results; writes made by other workers
+or scripts (archiving) show up within the TTL.
+"""
+
+import threading
+import time
+from datetime import date, datetime
+from typing import Dict, Optional
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import User, ensure_utc
+
+class UserState:
+    """Snapshot of the users columns the history readers use (read-only)"""
+
+    __slots__ = (
+        "id", "username", "is_active", "history_version", "archived_before",
+        "calendar_start", "training_calendar", "first_workout_at", "last_workout_at"
+    )
+
+    def __init__(self,
+                 id: int,
+                 username: str,
+                 is_active: bool,
+                 history_version: Optional[int],
+                 archived_before: Optional[datetime],
+                 calendar_start: Optional[date],
+                 training_calendar: Optional[bytes],
+                 first_workout_at: Optional[datetime],
+                 last_workout_at: Optional[datetime]):
+        self.id = id
+        self.username = username
+        self.is_active = bool(is_active)
+        self.history_version = history_version or 0
+        self.archived_before = ensure_utc(archived_before)
+        self.calendar_start = calendar_start
+        self.training_calendar = training_calendar
+        self.first_workout_at = ensure_utc(first_workout_at)
+        self.last_workout_at = ensure_utc(last_workout_at)
+
+    @classmethod
+    def from_row(cls, row) -> "UserState":
+        """From a User (or a row with the same columns)"""
+        return cls(
+            row.id, row.username, row.is_active, row.history_version, row.archived_before,
+            row.calendar_start, row.training_calendar, row.first_workout_at, row.last_workout_at
+        )
+
+def load_user_state(db: Session, user_id: int) -> Optional[UserState]:
+    """The user's state columns in one projected SELECT (None if there is no such user)"""
+    row = db.query(
+        User.id,
+        User.username,
+        User.is_active,
+        User.history_version,
+        User.archived_before,
+        User.calendar_start,
+        User.training_calendar,
+        User.first_workout_at,
+        User.last_workout_at
+    ).filter(User.id == user_id).first()
+    return UserState.from_row(row) if row is not None else None
+
+class UserStateCache:
+    """Thread-safe user_id -> UserState map with a TTL (0 disables it)"""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[UserState]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            return entry[1]
+
+    def put(self, state: UserState) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[state.id] = (time.monotonic() + self.ttl_seconds, state)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+user_state_cache = UserStateCache(settings.USER_STATE_CACHE_TTL_SECONDS)
@@ -0,0 +1,115 @@
+"""
+🧊 Cold Workout Archive
+Nearly every engine reads the last 7-90 days, so completed workouts older
+than ARCHIVE_AFTER_DAYS are moved (ids intact) into workouts_archive /
+workout_exercises_archive. Daily rollups stay untouched. Each user's
+archived_before watermark tells readers when a long-range query has to
+include the archive - short windows never touch it.
+
+Run with: python -m app.workout_archive run [--days N] [--user-id N]
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from sqlalchemy import func, insert, select, delete
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import (
+    User,
+    Workout,
+    WorkoutExercise,
+    ArchivedWorkout,
+    ArchivedWorkoutExercise,
+    ensure_utc
+)
+
+HOT_TABLES = (Workout, WorkoutExercise)
+ARCHIVE_TABLES = (ArchivedWorkout, ArchivedWorkoutExercise)
+
+WORKOUT_COLUMNS = ["id", "user_id", "name", "notes", "start_time", "end_time", "total_duration_minutes", "calories_burned"]
+ENTRY_COLUMNS = ["id", "workout_id", "exercise_id", "sets", "reps", "weight_kg", "duration_minutes", "distance_km", "calories"]
+
+def needs_archive(archived_before: Optional[datetime], since: Optional[datetime] = None) -> bool:
+    """True if a query starting at since (None = all time) can reach archived rows"""
+    if archived_before is None:
+        return False
+    return since is None or ensure_utc(since) < ensure_utc(archived_before)
+
+def history_tables(archived_before: Optional[datetime], since: Optional[datetime] = None) -> List[Tuple]:
+    """(workout model, entry model) pairs a query from since has to read"""
+    if needs_archive(archived_before, since):
+        return [HOT_TABLES, ARCHIVE_TABLES]
+    return [HOT_TABLES]
+
+def archive_old_workouts(db: Session,
+                         older_than_days: Optional[int] = None,
+                         user_id: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Move completed workouts that started before the horizon into the archive,
+    one transaction per user. Returns (workouts, entries) moved.
+    """
+    days = settings.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+
+    # Never move the highest id - SQLite would otherwise reuse archived ids
+    # once the hot table empties
+    max_id = db.query(func.max(Workout.id)).scalar()
+
+    criteria = [
+        Workout.end_time.isnot(None),
+        Workout.start_time < cutoff,
+        Workout.id != max_id
+    ]
+    if user_id is not None:
+        criteria.append(Workout.user_id == user_id)
+
+    user_ids = [uid for (uid,) in db.query(Workout.user_id).filter(*criteria).distinct()]
+    moved_workouts = moved_entries = 0
+
+    for uid in user_ids:
+        workout_ids = select(Workout.id).where(Workout.user_id == uid, *criteria)
+
+        moved_workouts += db.execute(
+            insert(ArchivedWorkout.__table__).from_select(
+                WORKOUT_COLUMNS,
+                select(*[Workout.__table__.c[name] for name in WORKOUT_COLUMNS]).where(Workout.id.in_(workout_ids))
+            )
+        ).rowcount
+        moved_entries += db.execute(
+            insert(ArchivedWorkoutExercise.__table__).from_select(
+                ENTRY_COLUMNS,
+                select(*[WorkoutExercise.__table__.c[name] for name in ENTRY_COLUMNS]).where(WorkoutExercise.workout_id.in_(workout_ids))
+            )
+        ).rowcount
+
+        db.execute(delete(WorkoutExercise).where(WorkoutExercise.workout_id.in_(workout_ids)))
+        # Filter directly - MySQL rejects a subquery on the table being deleted from
+        db.execute(delete(Workout).where(Workout.user_id == uid, *criteria))
+
+        user = db.get(User, uid)
+        if user is not None:
+            current = ensure_utc(user.archived_before)
+            user.archived_before = cutoff if current is None or cutoff > current else current
+        db.commit()
+
+    return moved_workouts, moved_entries
+
+if __name__ == "__main__":
+    import argparse
+    from app.database import Base, SessionLocal, engine
+    from app.migrations import run_migrations
+
+    parser = argparse.ArgumentParser(description="Move old completed workouts to the archive tables")
+    parser.add_argument("command", choices=["run"])
+    parser.add_argument("--days", type=int, default=None)
+    parser.add_argument("--user-id", type=int, default=None)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    db = SessionLocal()
+    try:
+        workouts, entries = archive_old_workouts(db, args.days, args.user_id)
+        print(f"✅ Archived {workouts} workouts ({entries} entries)")
+    finally:
+        db.close()
@@ -0,0 +1,146 @@
+"""
+📤 Streaming Workout History Export
+Write a user's complete history - workouts joined with their exercise
+entries, archived ones included - as NDJSON or CSV chunks. Rows are pulled
+from a server-side cursor (yield_per), so memory stays flat however long
+the history is.
+Both formats round-trip through app.workout_import.
+
+CLI: python -m app.workout_export --user-id N [--format csv|ndjson] > history.ndjson
+"""
+
+import csv
+import io
+import json
+from typing import Any, Dict, Iterator, Optional
+from sqlalchemy import select, union_all
+from sqlalchemy.orm import Session
+from app.models import User, Exercise, ensure_utc
+from app.workout_archive import history_tables
+from app.workout_import import CSV_COLUMNS, ENTRY_FIELDS
+
+YIELD_PER = 1000
+CHUNK_SIZE = 64 * 1024
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+def _isoformat(value) -> Optional[str]:
+    return ensure_utc(value).isoformat() if value else None
+
+def _history_select(tables, user_id: int):
+    workout_model, entry_model = tables
+    return select(
+        workout_model.id.label("workout_id"),
+        workout_model.name.label("name"),
+        workout_model.notes.label("notes"),
+        workout_model.start_time.label("start_time"),
+        workout_model.end_time.label("end_time"),
+        workout_model.total_duration_minutes.label("total_duration_minutes"),
+        workout_model.calories_burned.label("calories_burned"),
+        entry_model.id.label("entry_id"),
+        entry_model.exercise_id.label("exercise_id"),
+        Exercise.name.label("exercise"),
+        *[getattr(entry_model, field).label(field) for field in ENTRY_FIELDS]
+    ).outerjoin(
+        entry_model, entry_model.workout_id == workout_model.id
+    ).outerjoin(
+        Exercise, Exercise.id == entry_model.exercise_id
+    ).where(
+        workout_model.user_id == user_id
+    )
+
+def iter_history_rows(db: Session, user_id: int) -> Iterator[Any]:
+    """One row per entry (workouts without entries once), oldest workout first"""
+    archived_before = db.query(User.archived_before).filter(User.id == user_id).scalar()
+    selects = [_history_select(tables, user_id) for tables in history_tables(archived_before)]
+
+    history = (selects[0] if len(selects) == 1 else union_all(*selects)).subquery()
+    statement = select(history).order_by(
+        history.c.start_time.asc(), history.c.workout_id.asc(), history.c.entry_id.asc()
+    ).execution_options(yield_per=YIELD_PER)
+
+    yield from db.execute(statement)
+
+def iter_workout_records(db: Session, user_id: int) -> Iterator[Dict[str, Any]]:
+    """One nested workout record at a time (same shape the importer reads)"""
+    current = None
+    for row in iter_history_rows(db, user_id):
+        if current is None or current["id"] != row.workout_id:
+            if current is not None:
+                yield current
+            current = {
+                "id": row.workout_id,
+                "name": row.name,
+                "notes": row.notes,
+                "start_time": _isoformat(row.start_time),
+                "end_time": _isoformat(row.end_time),
+                "total_duration_minutes": row.total_duration_minutes,
+                "calories_burned": row.calories_burned,
+                "exercises": []
+            }
+        if row.exercise_id is not None:
+            current["exercises"].append({
+                "exercise_id": row.exercise_id,
+                "exercise": row.exercise,
+                **{field: getattr(row, field) for field in ENTRY_FIELDS}
+            })
+    if current is not None:
+        yield current
+
+def _chunked(lines: Iterator[str]) -> Iterator[str]:
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+def _ndjson_lines(db: Session, user_id: int) -> Iterator[str]:
+    for record in iter_workout_records(db, user_id):
+        yield json.dumps(record) + "\n"
+
+def _csv_lines(db: Session, user_id: int) -> Iterator[str]:
+    out = io.StringIO()
+    writer = csv.writer(out)
+
+    def take() -> str:
+        line = out.getvalue()
+        out.seek(0)
+        out.truncate()
+        return line
+
+    writer.writerow(CSV_COLUMNS)
+    yield take()
+    for record in iter_workout_records(db, user_id):
+        workout = [record["name"], record["start_time"], record["end_time"], record["notes"]]
+        # A workout without entries still gets one row so it round-trips
+        for entry in record["exercises"] or [{}]:
+            writer.writerow(workout + [entry.get("exercise")] + [entry.get(field) for field in ENTRY_FIELDS])
+        yield take()
+
+EXPORTERS = {"ndjson": _ndjson_lines, "csv": _csv_lines}
+
+def export_history(db: Session, user_id: int, fmt: str = "ndjson") -> Iterator[str]:
+    """Text chunks of a user's full history in the given format"""
+    if fmt not in EXPORTERS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    return _chunked(EXPORTERS[fmt](db, user_id))
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Export a user's workout history")
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--format", choices=sorted(EXPORTERS), default="ndjson")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        for chunk in export_history(db, args.user_id, args.format):
+            sys.stdout.write(chunk)
+    finally:
+        db.close()
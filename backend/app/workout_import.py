@@ -0,0 +1,279 @@
+"""
+📥 Bulk Workout History Import
+Stream NDJSON or CSV workout logs from other apps into a user's history.
+Input is parsed line by line, exercise names resolve against one in-memory
+catalog lookup, and workouts are inserted in batched transactions - the
+file is never held in memory.
+
+NDJSON: one workout per line
+    {"name": "Push", "start_time": "2024-01-05T18:00:00Z", "end_time": "...",
+     "notes": null, "exercises": [{"exercise": "Bench Press", "sets": 3, "reps": 8, "weight_kg": 60}]}
+CSV: one exercise entry per row (CSV_COLUMNS); consecutive rows with the
+same workout + start_time form one workout.
+
+CLI: python -m app.workout_import FILE --user-id N [--format csv|ndjson] [--batch-size 500]
+"""
+
+import csv
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.models import Workout, WorkoutExercise, Exercise, ensure_utc
+from app.training_rollups import (
+    accumulate_day_totals,
+    rebuild_day_summaries,
+    rebuild_exercise_progress,
+    rebuild_user_stats
+)
+from app.analytics_cache import bump_history_version
+
+CSV_COLUMNS = [
+    "workout", "start_time", "end_time", "notes", "exercise",
+    "sets", "reps", "weight_kg", "duration_minutes", "distance_km", "calories"
+]
+ENTRY_FIELDS = {
+    "sets": int,
+    "reps": int,
+    "weight_kg": float,
+    "duration_minutes": float,
+    "distance_km": float,
+    "calories": int,
+}
+MAX_REPORTED_ERRORS = 100
+
+class ImportRecordError(ValueError):
+    """A workout record that cannot be imported"""
+
+# --------------------------------------------------
+# PARSERS - yield (line_number, workout_record)
+# --------------------------------------------------
+def iter_ndjson(lines: Iterable[str]) -> Iterator[Tuple[int, Any]]:
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, ImportRecordError(f"Invalid JSON: {e.msg}")
+
+def iter_csv(lines: Iterable[str]) -> Iterator[Tuple[int, Any]]:
+    reader = csv.DictReader(lines)
+    current, current_key, start_line = None, None, 0
+
+    for row in reader:
+        key = (row.get("workout"), row.get("start_time"))
+        if current is not None and key != current_key:
+            yield start_line, current
+            current = None
+        if current is None:
+            current_key, start_line = key, reader.line_num
+            current = {
+                "name": row.get("workout"),
+                "start_time": row.get("start_time"),
+                "end_time": row.get("end_time"),
+                "notes": row.get("notes"),
+                "exercises": []
+            }
+        if row.get("exercise"):
+            current["exercises"].append(row)
+
+    if current is not None:
+        yield start_line, current
+
+PARSERS = {"ndjson": iter_ndjson, "csv": iter_csv}
+
+def _parse_time(value: Optional[str], field: str) -> Optional[datetime]:
+    if value in (None, ""):
+        return None
+    try:
+        return ensure_utc(datetime.fromisoformat(str(value).replace("Z", "+00:00")))
+    except ValueError:
+        raise ImportRecordError(f"Invalid {field}: {value!r}")
+
+def _parse_number(value: Any, cast: Callable, field: str):
+    if value in (None, ""):
+        return None
+    try:
+        return cast(float(value)) if cast is int else cast(value)
+    except (TypeError, ValueError):
+        raise ImportRecordError(f"Invalid {field}: {value!r}")
+
+# --------------------------------------------------
+# IMPORTER
+# --------------------------------------------------
+class WorkoutImporter:
+    """Validate workout records against the catalog and insert them in batches"""
+
+    def __init__(self, db: Session, user_id: int, batch_size: int = 500,
+                 on_batch: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.db = db
+        self.user_id = user_id
+        self.batch_size = max(1, batch_size)
+        self.on_batch = on_batch
+        self.batches: List[Dict[str, Any]] = []
+        self.errors: List[Dict[str, Any]] = []
+        self.error_count = 0
+        self.workouts_imported = 0
+        self.entries_imported = 0
+        self._pending: List[Tuple[Workout, List[Dict[str, Any]]]] = []
+
+        # One catalog query: lowercase name -> id, plus the set of valid ids.
+        # Read from the database - the in-memory catalog can lag other workers
+        self.exercise_ids: Dict[str, int] = {}
+        self.active_ids = set()
+        for exercise_id, name in db.query(Exercise.id, Exercise.name).filter(Exercise.is_active == True).order_by(Exercise.id.asc()):
+            self.exercise_ids.setdefault(name.strip().lower(), exercise_id)
+            self.active_ids.add(exercise_id)
+
+    def _record_error(self, line: int, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def _resolve_exercise(self, entry: Dict[str, Any]) -> int:
+        if entry.get("exercise_id") not in (None, ""):
+            exercise_id = _parse_number(entry["exercise_id"], int, "exercise_id")
+            if exercise_id not in self.active_ids:
+                raise ImportRecordError(f"Exercise with id {exercise_id} not found")
+            return exercise_id
+
+        name = (entry.get("exercise") or "").strip()
+        if name.lower() not in self.exercise_ids:
+            raise ImportRecordError(f"Unknown exercise: {name!r}")
+        return self.exercise_ids[name.lower()]
+
+    def _build(self, record: Dict[str, Any]) -> Tuple[Workout, List[Dict[str, Any]]]:
+        if not isinstance(record, dict):
+            raise ImportRecordError("Workout record must be an object")
+
+        start_time = _parse_time(record.get("start_time"), "start_time")
+        if start_time is None:
+            raise ImportRecordError("start_time is required")
+        # Imported history is already finished
+        end_time = _parse_time(record.get("end_time"), "end_time") or start_time
+
+        entries = []
+        for entry in record.get("exercises") or []:
+            if not isinstance(entry, dict):
+                raise ImportRecordError("Exercise entry must be an object")
+            values = {"exercise_id": self._resolve_exercise(entry)}
+            for field, cast in ENTRY_FIELDS.items():
+                values[field] = _parse_number(entry.get(field), cast, field)
+            entries.append(values)
+
+        workout = Workout(
+            user_id=self.user_id,
+            name=(record.get("name") or "Imported workout")[:100],
+            notes=record.get("notes") or None,
+            start_time=start_time,
+            end_time=end_time,
+            total_duration_minutes=round((end_time - start_time).total_seconds() / 60, 2),
+            calories_burned=sum(e["calories"] for e in entries if e["calories"])
+        )
+        return workout, entries
+
+    def add(self, line: int, record: Any) -> None:
+        """Validate one workout record and queue it for the current batch"""
+        try:
+            if isinstance(record, ImportRecordError):
+                raise record
+            self._pending.append(self._build(record))
+        except ImportRecordError as e:
+            self._record_error(line, str(e))
+            return
+
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Insert the queued workouts and their entries in one transaction"""
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        report = {"batch": len(self.batches) + 1, "workouts": 0, "entries": 0}
+
+        try:
+            self.db.add_all([workout for workout, _ in batch])
+            self.db.flush()
+            rows = [
+                {"workout_id": workout.id, **entry}
+                for workout, entries in batch
+                for entry in entries
+            ]
+            if rows:
+                self.db.execute(WorkoutExercise.__table__.insert(), rows)
+            # Each committed batch changes the history analytics read
+            bump_history_version(self.db, self.user_id)
+            self.db.commit()
+            report.update(workouts=len(batch), entries=len(rows))
+            self.workouts_imported += len(batch)
+            self.entries_imported += len(rows)
+        except Exception as e:
+            self.db.rollback()
+            report["error"] = str(e)
+            self.error_count += len(batch)
+
+        self.db.expunge_all()
+        self.batches.append(report)
+        if self.on_batch:
+            self.on_batch(report)
+
+    def finish(self) -> Dict[str, Any]:
+        """Flush the last batch and bring the rollups and user stats up to date"""
+        self.flush()
+        if self.workouts_imported:
+            rebuild_day_summaries(self.db, self.user_id)
+            accumulate_day_totals(self.db, self.user_id)
+            rebuild_exercise_progress(self.db, self.user_id)
+            rebuild_user_stats(self.db, self.user_id)
+            self.db.commit()
+        return {
+            "workouts_imported": self.workouts_imported,
+            "entries_imported": self.entries_imported,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "batches": self.batches,
+        }
+
+def import_workouts(db: Session,
+                    user_id: int,
+                    lines: Iterable[str],
+                    fmt: str = "ndjson",
+                    batch_size: int = 500,
+                    on_batch: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """Import a stream of text lines (NDJSON or CSV) for one user"""
+    if fmt not in PARSERS:
+        raise ValueError(f"Unsupported import format: {fmt}")
+    importer = WorkoutImporter(db, user_id, batch_size, on_batch)
+    for line, record in PARSERS[fmt](lines):
+        importer.add(line, record)
+    return importer.finish()
+
+if __name__ == "__main__":
+    import argparse
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Import workout history from NDJSON or CSV")
+    parser.add_argument("file")
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--format", choices=sorted(PARSERS), default=None)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.file.lower().endswith(".csv") else "ndjson")
+    db = SessionLocal()
+    try:
+        with open(args.file, newline="", encoding="utf-8") as f:
+            result = import_workouts(
+                db, args.user_id, f, fmt, args.batch_size,
+                on_batch=lambda b: print(f"  batch {b['batch']}: {b['workouts']} workouts, {b['entries']} entries"
+                                         + (f" - FAILED: {b['error']}" if "error" in b else ""))
+            )
+        for error in result["errors"]:
+            print(f"  line {error['line']}: {error['error']}")
+        print(f"✅ Imported {result['workouts_imported']} workouts "
+              f"({result['entries_imported']} entries), {result['error_count']} errors")
+    finally:
+        db.close()
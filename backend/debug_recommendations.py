@@ -3,13 +3,14 @@ import sys
 sys.path.append('.')
 from app.database import SessionLocal
 from app.recommendation import ExerciseRecommender
+from app.training_history import TrainingHistory
 
 db = SessionLocal()
 
 # Test with user ID 4 (test_athlete)
 try:
     print("Testing recommendation engine...")
-    recommender = ExerciseRecommender(db, 4)
+    recommender = ExerciseRecommender(TrainingHistory(db, 4))
     result = recommender.generate_recommendation()
     print("✅ Recommendation generated successfully!")
     print(f"User: {result['username']}")